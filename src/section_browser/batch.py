@@ -0,0 +1,300 @@
+"""
+Non-interactive batch runs of the maximum von Mises stress of a set of
+sections under a set of load combinations.
+
+A job file is a JSON document, e.g.
+    {
+        "sections": ["W310X97", "W250X73"],
+        "filters": [{"d": "<160"}, {"d": "300..320", "bf": ">=300"}],
+        "load_cases": [
+            {"case": "D", "Mx": 100e6},
+            {"case": "D+W", "Mx": 100e6, "Vy": 150e3, "T": 1e6}
+        ],
+        "fy": 350,
+        "mesh_size": 100
+    }
+The sections are those named in "sections" plus those passing any of the
+"filters" (each a dict of field to filter expression, as given to the
+'filter' command). The load combinations are either listed in "load_cases"
+or read from the CSV file named by "load_table" (relative to the job file,
+see the 'apply' command). "fy" and "mesh_size" are optional.
+
+Every section is crossed with every load combination and the results are
+written to the output file (CSV, or Parquet if its suffix is ".parquet") one
+section at a time, as soon as each section is analyzed. A checkpoint journal
+next to the output records the sections that have been written so that an
+interrupted run resumes where it stopped.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from section_browser import cache as section_cache
+from section_browser import session
+from section_browser import w_sections as wsec
+
+RESULT_COLUMNS = (
+    ["Section", "case"] + wsec.LOAD_COMPONENTS + ["fy", "sig_vm Max", "DCR stress", "error"]
+)
+DEFAULT_FY = 350
+DEFAULT_MESH_SIZE = 100
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+
+
+def read_job(path: pathlib.Path) -> dict:
+    """
+    Returns the job in the JSON job file at 'path' (see the module docstring)
+    with the load combinations in "load_cases" and the defaults filled in.
+    Raises ValueError if the job has no sections or no load combinations.
+    """
+    path = pathlib.Path(path)
+    with open(path, "r") as file:
+        job = json.load(file)
+    unknown_keys = set(job) - {"sections", "filters", "load_cases", "load_table", "fy", "mesh_size"}
+    if unknown_keys:
+        raise ValueError(f"Unknown job file keys: {sorted(unknown_keys)}")
+    if not job.get("sections") and not job.get("filters"):
+        raise ValueError("A job must list 'sections' or 'filters'")
+    if "load_table" in job:
+        load_cases_df = pd.read_csv(path.parent / job.pop("load_table"))
+        job["load_cases"] = [
+            {action: value for action, value in record.items() if pd.notna(value)}
+            for record in load_cases_df.to_dict(orient="records")
+        ]
+    if not job.get("load_cases"):
+        raise ValueError("A job must have 'load_cases' or a 'load_table'")
+    job.setdefault("sections", [])
+    job.setdefault("filters", [])
+    job.setdefault("fy", DEFAULT_FY)
+    job.setdefault("mesh_size", DEFAULT_MESH_SIZE)
+    wsec.load_case_matrix(job_load_cases(job))  # Validates the actions
+    return job
+
+
+def job_sections(job: dict, aisc_df: pd.DataFrame, apply_filters) -> pd.DataFrame:
+    """
+    Returns the rows of 'aisc_df' selected by 'job', in the order of 'aisc_df'.
+    'apply_filters' is a function returning the rows of a DataFrame that pass
+    a dict of field to filter expression (i.e. main._apply_all_filters).
+    Raises ValueError if a section named in the job is not in 'aisc_df'.
+    """
+    missing = set(job["sections"]) - set(aisc_df["Section"])
+    if missing:
+        raise ValueError(f"Sections not in the catalog: {sorted(missing)}")
+    selected = aisc_df["Section"].isin(job["sections"]).to_numpy()
+    for filters in job["filters"]:
+        expressions = {field: str(expression) for field, expression in filters.items()}
+        selected |= aisc_df.index.isin(apply_filters(aisc_df, expressions).index)
+    return aisc_df.loc[selected]
+
+
+def job_load_cases(job: dict) -> pd.DataFrame:
+    """
+    Returns the load combinations of 'job' as a DataFrame (see
+    wsec.load_case_matrix) with a "case" column. Combinations without a
+    "case" are labelled by their position in the job.
+    """
+    load_cases = pd.DataFrame(job["load_cases"])
+    if "case" not in load_cases.columns:
+        load_cases["case"] = load_cases.index
+    load_cases["case"] = [
+        position if pd.isna(case) else case
+        for position, case in zip(load_cases.index, load_cases["case"])
+    ]
+    return load_cases
+
+
+def job_hash(job: dict) -> str:
+    """
+    Returns a hex digest identifying the results of 'job'. Resuming a run is
+    only allowed into output written by a job with the same hash.
+    """
+    job_str = json.dumps(job, sort_keys=True, default=str)
+    return hashlib.sha256(job_str.encode("utf-8")).hexdigest()
+
+
+def result_rows(
+    steel_section: pd.Series,
+    load_cases: pd.DataFrame,
+    fy: float,
+    max_vm_stresses: Optional[np.ndarray],
+    error: str,
+) -> pd.DataFrame:
+    """
+    Returns a DataFrame of the RESULT_COLUMNS with one row per load
+    combination of 'steel_section'. 'max_vm_stresses' is None if the analysis
+    of the section failed with 'error'.
+    """
+    load_matrix = wsec.load_case_matrix(load_cases)
+    rows_df = pd.DataFrame(load_matrix, columns=wsec.LOAD_COMPONENTS)
+    rows_df.insert(0, "Section", steel_section["Section"])
+    rows_df.insert(1, "case", [str(case) for case in load_cases["case"]])
+    rows_df["fy"] = float(fy)
+    if max_vm_stresses is None:
+        rows_df["sig_vm Max"] = np.nan
+    else:
+        rows_df["sig_vm Max"] = max_vm_stresses
+    rows_df["DCR stress"] = rows_df["sig_vm Max"] / rows_df["fy"]
+    rows_df["error"] = error
+    return rows_df[RESULT_COLUMNS]
+
+
+class ResultWriter:
+    """
+    Writes result rows to 'output_path' one section at a time and records
+    each section written in a checkpoint journal at 'output_path' +
+    CHECKPOINT_SUFFIX. The journal starts with a header holding the hash of
+    the job that the results belong to.
+
+    A CSV output is appended to and the size of the file after each section
+    is checkpointed, so rows written after the last checkpoint (e.g. cut off
+    by an interruption) are truncated when the run resumes. A Parquet output
+    is a directory of one file per section that is only checkpointed once it
+    is completely written; pd.read_parquet() reads the directory as one table.
+    """
+
+    def __init__(self, output_path: pathlib.Path, job_digest: str, restart: bool = False):
+        self.output_path = pathlib.Path(output_path)
+        self.checkpoint_path = self.output_path.with_name(
+            self.output_path.name + CHECKPOINT_SUFFIX
+        )
+        self.parquet = self.output_path.suffix.lower() == ".parquet"
+        if self.parquet:
+            # Fail before any section is analyzed rather than after the first one
+            import pyarrow  # noqa: F401
+        self.job_digest = job_digest
+        self.finished: set[str] = set()
+        self._offset = 0
+        if restart:
+            self._remove_output()
+        self._resume()
+
+    def write(self, section_key: str, rows_df: pd.DataFrame) -> None:
+        """
+        Returns None. Writes the result rows 'rows_df' of the section with the
+        cache key 'section_key' and checkpoints them.
+        """
+        if self.parquet:
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            part_name = f"part-{len(self.finished):06d}.parquet"
+            fd, tmp_name = tempfile.mkstemp(dir=self.output_path, suffix=".tmp")
+            os.close(fd)
+            try:
+                rows_df.to_parquet(tmp_name, index=False)
+                os.replace(tmp_name, self.output_path / part_name)
+            except BaseException:
+                pathlib.Path(tmp_name).unlink(missing_ok=True)
+                raise
+            record = {"key": section_key, "part": part_name}
+        else:
+            with open(self.output_path, "a", newline="") as file:
+                rows_df.to_csv(file, header=self._offset == 0, index=False)
+                file.flush()
+                os.fsync(file.fileno())
+                self._offset = file.tell()
+            record = {"key": section_key, "offset": self._offset}
+        with open(self.checkpoint_path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.finished.add(section_key)
+
+    def _resume(self) -> None:
+        """
+        Reads the checkpoint journal and removes any output written after the
+        last checkpoint. Starts a new journal if there is none.
+        """
+        try:
+            with open(self.checkpoint_path, "r") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            lines = []
+        if not lines:
+            self._remove_output()
+            with open(self.checkpoint_path, "w") as file:
+                file.write(json.dumps({"job": self.job_digest}) + "\n")
+            return
+        if json.loads(lines[0]).get("job") != self.job_digest:
+            raise ValueError(
+                f"{self.output_path} holds the results of a different job. "
+                "Restart the run or choose another output file."
+            )
+        parts = set()
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Line truncated by an interrupted write
+            self.finished.add(record["key"])
+            if self.parquet:
+                parts.add(record["part"])
+            else:
+                self._offset = record["offset"]
+        if self.parquet:
+            for part in self.output_path.glob("*"):
+                if part.name not in parts:
+                    part.unlink()
+        elif self.output_path.exists():
+            with open(self.output_path, "r+b") as file:
+                file.truncate(self._offset)
+
+    def _remove_output(self) -> None:
+        self.checkpoint_path.unlink(missing_ok=True)
+        if self.output_path.is_dir():
+            for part in self.output_path.glob("*"):
+                part.unlink()
+            self.output_path.rmdir()
+        else:
+            self.output_path.unlink(missing_ok=True)
+
+
+def run_job(
+    job: dict,
+    aisc_df: pd.DataFrame,
+    output_path: pathlib.Path,
+    apply_filters,
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    results_store: Optional[session.ResultsStore] = None,
+    restart: bool = False,
+):
+    """
+    Yields a tuple of (section name, error, n_remaining) after the results of
+    each section of 'job' are written to 'output_path'. Sections that were
+    written by an earlier, interrupted run of the same job are skipped unless
+    'restart' is True, in which case the output is written again from scratch.
+
+    'aisc_df' and 'apply_filters' are as described in job_sections().
+    'use_cache', 'workers' and 'results_store' are as described in
+    wsec.calculate_section_stresses().
+    """
+    sections_df = job_sections(job, aisc_df, apply_filters)
+    load_cases = job_load_cases(job)
+    writer = ResultWriter(output_path, job_hash(job), restart=restart)
+    section_keys = [
+        section_cache.section_key(row, job["mesh_size"]) for _, row in sections_df.iterrows()
+    ]
+    pending = np.array([key not in writer.finished for key in section_keys], dtype=bool)
+    pending_df = sections_df.loc[pending]
+    pending_keys = [key for key, is_pending in zip(section_keys, pending) if is_pending]
+    n_remaining = len(pending_df)
+    for position, max_vm_stresses, error, _ in wsec.iter_load_combinations(
+        pending_df,
+        load_cases,
+        job["mesh_size"],
+        use_cache,
+        workers,
+        results_store,
+    ):
+        steel_section = pending_df.iloc[position]
+        rows_df = result_rows(steel_section, load_cases, job["fy"], max_vm_stresses, error)
+        writer.write(pending_keys[position], rows_df)
+        n_remaining -= 1
+        yield steel_section["Section"], error, n_remaining
@@ -0,0 +1,200 @@
+"""
+On-disk, content-addressed cache of meshed and analyzed W-sections.
+
+None of the meshing or the geometric/warping analysis of a W-section
+depends on the applied loads so the analyzed section can be stored
+once and re-used for every subsequent load case.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import tempfile
+from collections import OrderedDict
+from importlib import metadata
+from typing import Any, Optional
+
+import section_browser
+
+CACHE_DIR_ENV = "SECTION_BROWSER_CACHE_DIR"
+CACHE_SIZE_ENV = "SECTION_BROWSER_CACHE_MB"
+DEFAULT_CACHE_DIR = pathlib.Path.home() / ".cache" / "section_browser"
+DEFAULT_MAX_MB = 512
+KEY_FIELDS = ["Section", "d", "bf", "tw", "tf", "kdes"]
+
+# Objects recently read from or written to any SectionCache in this process,
+# most recently used last. Only used once keep_in_memory() is called.
+_memory: OrderedDict = OrderedDict()
+_memory_items = 0
+
+
+def cache_dir() -> pathlib.Path:
+    """
+    Returns the directory used for the cache. Can be overridden with the
+    SECTION_BROWSER_CACHE_DIR environment variable.
+    """
+    return pathlib.Path(os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+
+
+def keep_in_memory(max_items: int) -> None:
+    """
+    Returns None. Keeps up to 'max_items' of the most recently used cached
+    objects in memory so that a long-running process (see
+    section_browser.daemon) does not unpickle them from disk again.
+    """
+    global _memory_items
+    _memory_items = max_items
+    while len(_memory) > _memory_items:
+        _memory.popitem(last=False)
+
+
+def section_key(steel_section, mesh_size: float, kind: str = "section") -> str:
+    """
+    Returns a hex digest uniquely identifying the analysis of 'steel_section'
+    (a record from the AISC db) at 'mesh_size'. The key includes the versions
+    of section_browser and sectionproperties so that upgrading either one
+    invalidates previously cached results.
+
+    'kind' distinguishes between different artifacts stored for the same
+    section.
+    """
+    key_data = {field: _json_value(steel_section[field]) for field in KEY_FIELDS}
+    key_data.update(
+        {
+            "mesh_size": float(mesh_size),
+            "kind": kind,
+            "section_browser": section_browser.__version__,
+            "sectionproperties": _sectionproperties_version(),
+        }
+    )
+    key_str = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+
+
+class SectionCache:
+    """
+    A directory of pickled objects addressed by the keys returned from
+    section_key(). The total size of the directory is kept under 'max_bytes'
+    by evicting the least recently used entries.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(
+        self, path: Optional[pathlib.Path] = None, max_bytes: Optional[int] = None
+    ):
+        self.path = pathlib.Path(path) if path is not None else cache_dir()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_MB)) * 2**20)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the object stored under 'key' or None if there is no such
+        entry (or the entry cannot be read).
+        """
+        entry = self._entry_path(key)
+        if entry in _memory:
+            _memory.move_to_end(entry)
+            return _memory[entry]
+        try:
+            with open(entry, "rb") as file:
+                obj = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        try:
+            os.utime(entry)  # Mark as recently used
+        except OSError:
+            pass  # Evicted by another process since it was read
+        _remember(entry, obj)
+        return obj
+
+    def put(self, key: str, obj: Any) -> None:
+        """
+        Returns None. Stores 'obj' under 'key' and evicts old entries if the
+        cache has grown beyond 'max_bytes'.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, self._entry_path(key))
+        except BaseException:
+            pathlib.Path(tmp_name).unlink(missing_ok=True)
+            raise
+        _remember(self._entry_path(key), obj)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Returns None. Removes the least recently used entries until the total
+        size of the cache is within 'max_bytes'.
+        """
+        entries = []
+        for entry in self.path.glob(f"*{self.suffix}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            _memory.pop(entry, None)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Returns None. Removes all entries from the cache.
+        """
+        for entry in self.path.glob(f"*{self.suffix}"):
+            entry.unlink(missing_ok=True)
+            _memory.pop(entry, None)
+
+    def size_bytes(self) -> int:
+        """
+        Returns the total size of the entries in the cache.
+        """
+        return sum(entry.stat().st_size for entry in self.path.glob(f"*{self.suffix}"))
+
+    def __contains__(self, key: str) -> bool:
+        return self._entry_path(key).exists()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.path / f"{key}{self.suffix}"
+
+
+def default_cache() -> SectionCache:
+    """
+    Returns a SectionCache in the default cache directory.
+    """
+    return SectionCache()
+
+
+def _remember(entry: pathlib.Path, obj: Any) -> None:
+    if _memory_items > 0:
+        _memory[entry] = obj
+        _memory.move_to_end(entry)
+        while len(_memory) > _memory_items:
+            _memory.popitem(last=False)
+
+
+def _sectionproperties_version() -> str:
+    try:
+        return metadata.version("sectionproperties")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _json_value(value):
+    """
+    Returns 'value' as a plain Python type so it can be serialized to JSON.
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    return value
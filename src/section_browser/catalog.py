@@ -0,0 +1,155 @@
+"""
+Binary columnar form of a section catalog CSV file.
+
+The first time a catalog is loaded, its columns are saved as the fields of a
+single NumPy structured array (string columns as fixed-width unicode fields)
+in a directory named after the hash of the CSV contents. Later loads
+memory-map the array instead of parsing the CSV. Editing the CSV changes its
+hash so the binary form is rebuilt automatically.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+from collections.abc import Mapping
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from section_browser import cache as section_cache
+
+MANIFEST_FILE = "columns.json"
+ARRAY_FILE = "columns.npy"
+FORMAT_VERSION = 1
+
+# DataFrames of the catalogs loaded by this process, by compiled directory
+_loaded: dict[pathlib.Path, pd.DataFrame] = {}
+
+
+def catalog_hash(csv_path: pathlib.Path) -> str:
+    """
+    Returns the sha256 hex digest of the contents of 'csv_path'.
+    """
+    return hashlib.sha256(pathlib.Path(csv_path).read_bytes()).hexdigest()
+
+
+class CatalogColumns(Mapping):
+    """
+    A read-only mapping of column name to NumPy array for a compiled catalog.
+    The catalog is memory-mapped from disk the first time a column is accessed.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        with open(self.path / MANIFEST_FILE, "r") as file:
+            self.manifest = json.load(file)
+        self._records = None
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        if column not in self.manifest["columns"]:
+            raise KeyError(column)
+        if self._records is None:
+            self._records = np.load(self.path / ARRAY_FILE, mmap_mode="r")
+        return self._records[column]
+
+    def __iter__(self):
+        return iter(self.manifest["columns"])
+
+    def __len__(self) -> int:
+        return len(self.manifest["columns"])
+
+    def to_dataframe(self, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Returns a DataFrame of 'columns' (all columns by default) with the same
+        dtypes as pd.read_csv() gives for the source CSV.
+        """
+        columns = list(self) if columns is None else columns
+        data = {}
+        for column in columns:
+            array = self[column]
+            if array.dtype.kind == "U":
+                array = array.astype(object)
+            data[column] = array
+        return pd.DataFrame(data, columns=columns, copy=True)
+
+
+def compile_catalog(csv_path: pathlib.Path, path: pathlib.Path) -> pathlib.Path:
+    """
+    Returns 'path' after writing the binary columnar form of the CSV file at
+    'csv_path' into it. The directory is written to a temporary location first
+    and then renamed so a partially written catalog is never read.
+    """
+    catalog_df = pd.read_csv(csv_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = pathlib.Path(tempfile.mkdtemp(dir=path.parent, suffix=".tmp"))
+    try:
+        arrays = []
+        for column in catalog_df.columns:
+            series = catalog_df[column]
+            if series.dtype == object:
+                arrays.append(series.to_numpy(dtype=str))
+            else:
+                arrays.append(series.to_numpy())
+        records = np.empty(
+            len(catalog_df),
+            dtype=[(column, array.dtype) for column, array in zip(catalog_df.columns, arrays)],
+        )
+        for column, array in zip(catalog_df.columns, arrays):
+            records[column] = array
+        np.save(tmp_path / ARRAY_FILE, records)
+        manifest = {
+            "source": str(csv_path),
+            "hash": catalog_hash(csv_path),
+            "columns": list(catalog_df.columns),
+        }
+        with open(tmp_path / MANIFEST_FILE, "w") as file:
+            json.dump(manifest, file)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process compiled the same catalog first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return path
+
+
+def load_catalog_columns(
+    csv_path: pathlib.Path, cache_root: Optional[pathlib.Path] = None
+) -> CatalogColumns:
+    """
+    Returns the CatalogColumns of the CSV file at 'csv_path', compiling it into
+    'cache_root' (the "catalog" directory of the section cache by default) if
+    this version of the file has not been compiled before.
+    """
+    if cache_root is None:
+        cache_root = section_cache.cache_dir() / "catalog"
+    path = pathlib.Path(cache_root) / f"{catalog_hash(csv_path)}-v{FORMAT_VERSION}"
+    if not (path / MANIFEST_FILE).exists():
+        compile_catalog(csv_path, path)
+    return CatalogColumns(path)
+
+
+def load_catalog(
+    csv_path: pathlib.Path, cache_root: Optional[pathlib.Path] = None
+) -> pd.DataFrame:
+    """
+    Returns a DataFrame of the catalog in the CSV file at 'csv_path', read from
+    its compiled binary form. Falls back to parsing the CSV if the compiled
+    form cannot be written (e.g. a read-only cache directory).
+
+    Each version of a catalog is only read once per process; later calls
+    return a copy of the DataFrame kept in memory.
+    """
+    try:
+        columns = load_catalog_columns(csv_path, cache_root)
+    except OSError:
+        return pd.read_csv(csv_path)
+    if columns.path not in _loaded:
+        _loaded[columns.path] = columns.to_dataframe()
+    return _loaded[columns.path].copy()
@@ -0,0 +1,227 @@
+"""
+Optional local daemon that runs sectionbrowser commands in a long-running
+process so that the analysis stack is imported once and the catalog and
+analyzed sections stay in memory between commands.
+
+The daemon listens on a Unix domain socket (see socket_path()). Each request
+is one JSON line:
+    {"argv": [...], "cwd": "...", "width": 120, "terminal": true}
+and the daemon replies with JSON lines of {"output": "..."} as the command
+prints, followed by a final {"exit_code": 0}. The selection state is kept in
+the data store file, as for commands run in-process, so the two can be mixed.
+
+This module is the entry point of the sectionbrowser script (see run()) so it
+only imports what is needed to forward a command to the daemon.
+"""
+
+import contextlib
+import io
+import json
+import os
+import pathlib
+import shutil
+import socket
+import socketserver
+import sys
+import traceback
+from typing import Optional
+
+from section_browser import cache as section_cache
+
+SOCKET_ENV = "SECTION_BROWSER_SOCKET"
+DISABLE_ENV = "SECTION_BROWSER_NO_DAEMON"
+SOCKET_FILE = "daemon.sock"
+MEMORY_ITEMS = 256
+# Commands that manage the daemon itself and always run in-process
+LOCAL_COMMANDS = ["daemon"]
+
+
+def socket_path() -> pathlib.Path:
+    """
+    Returns the path of the daemon's socket: the SECTION_BROWSER_SOCKET
+    environment variable or "daemon.sock" in the section cache directory.
+    """
+    if os.environ.get(SOCKET_ENV):
+        return pathlib.Path(os.environ[SOCKET_ENV])
+    return section_cache.cache_dir() / SOCKET_FILE
+
+
+def run() -> None:
+    """
+    Runs the sectionbrowser command in sys.argv with the daemon if it is
+    running and in this process otherwise.
+    """
+    exit_code = forward(sys.argv[1:])
+    if exit_code is None:
+        from section_browser.main import app
+
+        app()
+    sys.exit(exit_code)
+
+
+def forward(argv: list[str], path: Optional[pathlib.Path] = None) -> Optional[int]:
+    """
+    Returns the exit code of the sectionbrowser command 'argv' run by the
+    daemon listening at 'path' (socket_path() by default), writing its output
+    to stdout as it is produced. Returns None, without running the command,
+    if no daemon is running, if the SECTION_BROWSER_NO_DAEMON environment
+    variable is set or if 'argv' is a command that always runs in-process.
+    """
+    if os.environ.get(DISABLE_ENV) or (argv and argv[0] in LOCAL_COMMANDS):
+        return None
+    path = socket_path() if path is None else pathlib.Path(path)
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(str(path))
+    except OSError:
+        # No daemon, or a stale socket left by one that was killed
+        connection.close()
+        return None
+    request = {
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "width": shutil.get_terminal_size().columns,
+        "terminal": sys.stdout.isatty(),
+    }
+    with connection, connection.makefile("rwb") as stream:
+        stream.write((json.dumps(request) + "\n").encode("utf-8"))
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            if "output" in reply:
+                sys.stdout.write(reply["output"])
+                sys.stdout.flush()
+            else:
+                return reply["exit_code"]
+    return 1  # The daemon exited while running the command
+
+
+def stop(path: Optional[pathlib.Path] = None) -> bool:
+    """
+    Returns True if a daemon was listening at 'path' (socket_path() by
+    default) and has been asked to stop.
+    """
+    path = socket_path() if path is None else pathlib.Path(path)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(str(path))
+            connection.sendall((json.dumps({"stop": True}) + "\n").encode("utf-8"))
+            connection.recv(1024)
+    except OSError:
+        return False
+    return True
+
+
+def is_running(path: Optional[pathlib.Path] = None) -> bool:
+    """
+    Returns True if a daemon is listening at 'path' (socket_path() by default).
+    """
+    path = socket_path() if path is None else pathlib.Path(path)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(str(path))
+    except OSError:
+        return False
+    return True
+
+
+class _OutputStream(io.TextIOBase):
+    """
+    A text stream that sends everything written to it to the client.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.stream.write((json.dumps({"output": text}) + "\n").encode("utf-8"))
+            self.stream.flush()
+        return len(text)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        if request.get("stop"):
+            self.wfile.write(b"{}\n")
+            self.server.stopping = True
+            return
+        exit_code = self.server.run_command(request, _OutputStream(self.wfile))
+        self.wfile.write((json.dumps({"exit_code": exit_code}) + "\n").encode("utf-8"))
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    Serves sectionbrowser commands on the Unix domain socket at 'path', one
+    at a time, with the typer 'app'.
+    """
+
+    def __init__(self, path: pathlib.Path, app):
+        self.path = pathlib.Path(path)
+        self.app = app
+        self.stopping = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)  # Stale socket of a killed daemon
+        old_umask = os.umask(0o077)  # Only the current user may connect
+        try:
+            super().__init__(str(self.path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def serve_until_stopped(self) -> None:
+        """
+        Returns None. Handles requests until a client asks the daemon to stop.
+        """
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            self.path.unlink(missing_ok=True)
+
+    def run_command(self, request: dict, output: io.TextIOBase) -> int:
+        """
+        Returns the exit code of running the command in 'request' with its
+        output (including rich output) written to 'output'.
+        """
+        import rich
+
+        console = rich.get_console()
+        console_state = dict(console.__dict__)
+        cwd = os.getcwd()
+        try:
+            os.chdir(request["cwd"])
+            rich.reconfigure(
+                file=output,
+                width=request["width"],
+                force_terminal=request["terminal"],
+            )
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                try:
+                    self.app(args=request["argv"], prog_name="sectionbrowser")
+                except SystemExit as err:
+                    return err.code if isinstance(err.code, int) else int(err.code is not None)
+                except Exception:
+                    traceback.print_exc()
+                    return 1
+            return 0
+        finally:
+            console.__dict__ = console_state
+            os.chdir(cwd)
+
+
+def serve(app, path: Optional[pathlib.Path] = None) -> None:
+    """
+    Returns None. Runs the daemon for the typer 'app' at 'path' (socket_path()
+    by default) until it is stopped. The analysis stack is imported up front
+    and analyzed sections are kept in memory (see cache.keep_in_memory).
+    """
+    import sectionproperties.analysis.section  # noqa: F401
+
+    section_cache.keep_in_memory(MEMORY_ITEMS)
+    server = DaemonServer(socket_path() if path is None else path, app)
+    server.serve_until_stopped()
@@ -0,0 +1,233 @@
+"""
+Incremental export of tables of results to CSV, Parquet and Excel files.
+
+Rows are written in chunks (DataFrames) as they are produced, so a table
+never has to be held in memory as a whole:
+    - CSV chunks are appended to the file
+    - Parquet chunks are each written as a row group (requires pyarrow)
+    - xlsx rows are streamed with openpyxl's write-only mode
+
+e.g.
+    with ResultExporter("results.xlsx") as exporter:
+        for chunk_df in chunks:
+            exporter.write(chunk_df)
+
+The file is written to a temporary file next to 'path' and only replaces
+'path' once the export is complete.
+"""
+
+import os
+import pathlib
+import tempfile
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".xlsx": "xlsx"}
+CHUNK_ROWS = 10_000
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_NAME = "Results"
+
+
+def export_format(path: pathlib.Path) -> str:
+    """
+    Returns the format ("csv", "parquet" or "xlsx") of an export to 'path',
+    from its suffix. Raises ValueError for any other suffix.
+    """
+    suffix = pathlib.Path(path).suffix.lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Cannot export to '{suffix}' files, use one of {', '.join(EXPORT_FORMATS)}"
+        )
+    return EXPORT_FORMATS[suffix]
+
+
+class ResultExporter:
+    """
+    Writes chunks of rows (DataFrames with the same columns) to 'path' in the
+    format given by its suffix (see export_format()). Use it as a context
+    manager, or call close() once all of the chunks are written.
+    Raises ImportError when exporting to Parquet without pyarrow.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.format = export_format(self.path)
+        if self.format == "parquet":
+            # Fail before any rows are produced rather than at the first chunk
+            import pyarrow  # noqa: F401
+        self.n_rows = 0
+        self.columns: Optional[list] = None
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        os.close(fd)
+        self.tmp_path = pathlib.Path(tmp_name)
+        self._file = None
+        self._parquet_writer = None
+        self._parquet_schema = None
+        self._workbook = None
+        self._worksheet = None
+        if self.format == "csv":
+            self._file = open(self.tmp_path, "w", newline="")
+        elif self.format == "xlsx":
+            from openpyxl import Workbook
+
+            self._workbook = Workbook(write_only=True)
+            self._worksheet = self._workbook.create_sheet(SHEET_NAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, chunk_df: pd.DataFrame) -> None:
+        """
+        Returns None. Writes the rows of 'chunk_df' after the rows written so
+        far. Raises ValueError if its columns differ from those of the first
+        chunk or if the rows would not fit in an Excel worksheet.
+        """
+        if self.columns is None:
+            self.columns = list(chunk_df.columns)
+            self._write_header()
+        elif list(chunk_df.columns) != self.columns:
+            raise ValueError("Every chunk of an export must have the same columns")
+        if self.format == "csv":
+            chunk_df.to_csv(self._file, header=False, index=False)
+        elif self.format == "parquet":
+            self._write_parquet(chunk_df)
+        else:
+            if self.n_rows + len(chunk_df) + 1 > EXCEL_MAX_ROWS:
+                raise ValueError(f"An Excel worksheet holds at most {EXCEL_MAX_ROWS} rows")
+            for record in chunk_df.itertuples(index=False, name=None):
+                self._worksheet.append([_excel_value(value) for value in record])
+        self.n_rows += len(chunk_df)
+
+    def close(self) -> None:
+        """
+        Returns None. Finishes the file and moves it to 'path'.
+        """
+        try:
+            if self.format == "csv":
+                self._file.close()
+            elif self.format == "parquet":
+                if self._parquet_writer is None:
+                    pd.DataFrame(columns=self.columns or []).to_parquet(self.tmp_path, index=False)
+                else:
+                    self._parquet_writer.close()
+            else:
+                self._workbook.save(self.tmp_path)
+            os.replace(self.tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """
+        Returns None. Discards the rows written so far, leaving 'path' as it was.
+        """
+        if self._file is not None:
+            self._file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def _write_header(self) -> None:
+        if self.format == "csv":
+            pd.DataFrame(columns=self.columns).to_csv(self._file, index=False)
+        elif self.format == "xlsx":
+            self._worksheet.append([str(column) for column in self.columns])
+
+    def _write_parquet(self, chunk_df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._parquet_writer is None:
+            table = pa.Table.from_pandas(chunk_df, preserve_index=False)
+            self._parquet_schema = table.schema
+            self._parquet_writer = pq.ParquetWriter(self.tmp_path, self._parquet_schema)
+        else:
+            table = pa.Table.from_pandas(
+                chunk_df, schema=self._parquet_schema, preserve_index=False
+            )
+        self._parquet_writer.write_table(table)
+
+
+def dataframe_chunks(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """
+    Yields consecutive slices of 'df' of at most 'chunk_rows' rows.
+    """
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start : start + chunk_rows]
+
+
+def row_chunks(rows: Iterable[pd.Series], chunk_rows: int = CHUNK_ROWS):
+    """
+    Yields DataFrames of at most 'chunk_rows' of the 'rows' at a time, in the
+    order of 'rows', so that only one chunk of rows is held in memory.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_rows:
+            yield pd.DataFrame(chunk)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk)
+
+
+def frame_chunks(frames: Iterable[pd.DataFrame], chunk_rows: int = CHUNK_ROWS):
+    """
+    Yields DataFrames of the consecutive 'frames' joined together until they
+    have at least 'chunk_rows' rows, so that small frames (e.g. the rows of
+    one section) are not written as separate Parquet row groups.
+    """
+    chunk = []
+    n_rows = 0
+    for frame_df in frames:
+        chunk.append(frame_df)
+        n_rows += len(frame_df)
+        if n_rows >= chunk_rows:
+            yield pd.concat(chunk, ignore_index=True)
+            chunk = []
+            n_rows = 0
+    if chunk:
+        yield pd.concat(chunk, ignore_index=True)
+
+
+def export_chunks(chunks: Iterable[pd.DataFrame], path: pathlib.Path) -> int:
+    """
+    Returns the number of rows written to 'path' from the DataFrames in
+    'chunks' (see ResultExporter).
+    """
+    with ResultExporter(path) as exporter:
+        for chunk_df in chunks:
+            exporter.write(chunk_df)
+    return exporter.n_rows
+
+
+def export_dataframe(df: pd.DataFrame, path: pathlib.Path, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Returns the number of rows of 'df' written to 'path', 'chunk_rows' at a
+    time (see ResultExporter).
+    """
+    return export_chunks(dataframe_chunks(df, chunk_rows), path)
+
+
+def _excel_value(value):
+    """
+    Returns 'value' as a type that openpyxl can write to a cell. Missing
+    values become empty cells.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
@@ -0,0 +1,145 @@
+"""
+Reuse of the element integration of sectionproperties' analyses.
+
+sectionproperties integrates each quadratic triangle at six Gauss points in
+every pass over the mesh, recomputing the shape functions, their derivatives
+and the Jacobian each time: once for the geometric properties and five times
+(torsion, shear loads, shear centre, shear deformation, monosymmetry) for the
+warping properties, on the same element coordinates. Within
+reused_shape_functions(), the six Gauss points of an element are evaluated
+together in one batched NumPy call the first time the element is integrated
+and later passes look them up instead.
+
+The linear solves of the warping analysis (one LU factorization per system)
+take well under 1% of its time, so they are left to sectionproperties.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+# Shape functions of the elements integrated so far, by the bytes of their
+# coordinates and then of the Gauss point; None outside reused_shape_functions()
+_cache: Optional[dict[bytes, dict[bytes, tuple]]] = None
+_original_shape_function = None
+# Guards the patching of sectionproperties and the number of callers (in any
+# thread) currently within reused_shape_functions()
+_lock = threading.Lock()
+_n_users = 0
+# The six-point Gauss rule that sectionproperties integrates the elements with
+_gauss_points: Optional[np.ndarray] = None
+_gauss_point_keys: list[bytes] = []
+# Shape functions and their isoparametric derivatives, by Gauss points
+_isoparametric: dict[bytes, tuple[np.ndarray, np.ndarray]] = {}
+
+
+@contextmanager
+def reused_shape_functions():
+    """
+    Context manager within which sectionproperties evaluates the shape
+    functions of each element once per set of coordinates (see the module
+    docstring). Results are the same as without it, to rounding.
+
+    sectionproperties' fea.shape_function() is replaced process-wide, so
+    every analysis running while any thread is within the context manager
+    shares the cache. Nested and concurrent uses are reference counted: the
+    original function is restored and the cache released when the last one
+    exits.
+    """
+    global _cache, _original_shape_function, _gauss_points, _gauss_point_keys, _n_users
+    from sectionproperties.analysis import fea
+
+    with _lock:
+        if _n_users == 0:
+            if _gauss_points is None:
+                _gauss_points = np.asarray(fea.gauss_points(6), dtype=float)
+                _gauss_point_keys = [point.tobytes() for point in _gauss_points]
+            _cache = {}
+            _original_shape_function = fea.shape_function
+            fea.shape_function = _cached_shape_function
+        _n_users += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _n_users -= 1
+            if _n_users == 0:
+                fea.shape_function = _original_shape_function
+                _cache = None
+
+
+def batched_shape_functions(
+    coords: np.ndarray, gauss_points: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns a tuple of the shape functions (n_points, 6), their derivatives
+    in global coordinates (n_points, 2, 6) and the Jacobian determinants
+    (n_points,) of the quadratic triangle with the (2, 6) 'coords' at each of
+    the 'gauss_points' (rows of weight, eta, xi, zeta), as given one point at
+    a time by sectionproperties' fea.shape_function().
+    """
+    N, B_iso_t = _isoparametric_functions(gauss_points)
+    J = np.empty((len(gauss_points), 3, 3))
+    J[:, 0, :] = 1
+    J[:, 1:, :] = coords @ B_iso_t
+    j = 0.5 * np.linalg.det(J)
+    B = np.zeros((len(gauss_points), 2, 6))
+    nonzero = j != 0
+    if nonzero.any():
+        P = np.linalg.inv(J[nonzero])[:, :, 1:]
+        B[nonzero] = (B_iso_t[nonzero] @ P).transpose(0, 2, 1)
+    return N, B, j
+
+
+def _isoparametric_functions(gauss_points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple of the shape functions (n_points, 6) and the transposed
+    derivatives of the shape functions with respect to the isoparametric
+    coordinates (n_points, 6, 3) at the 'gauss_points'.
+    """
+    key = gauss_points.tobytes()
+    if key not in _isoparametric:
+        eta, xi, zeta = gauss_points[:, 1], gauss_points[:, 2], gauss_points[:, 3]
+        zero = np.zeros_like(eta)
+        N = np.stack(
+            [
+                eta * (2 * eta - 1),
+                xi * (2 * xi - 1),
+                zeta * (2 * zeta - 1),
+                4 * eta * xi,
+                4 * xi * zeta,
+                4 * eta * zeta,
+            ],
+            axis=-1,
+        )
+        B_iso_t = np.stack(
+            [
+                np.stack([4 * eta - 1, zero, zero, 4 * xi, zero, 4 * zeta], axis=-1),
+                np.stack([zero, 4 * xi - 1, zero, 4 * eta, 4 * zeta, zero], axis=-1),
+                np.stack([zero, zero, 4 * zeta - 1, zero, 4 * xi, 4 * eta], axis=-1),
+            ],
+            axis=-1,
+        )
+        _isoparametric[key] = (N, B_iso_t)
+    return _isoparametric[key]
+
+
+def _cached_shape_function(coords, gauss_point):
+    cache = _cache
+    if cache is None:
+        # Looked up before the last user of reused_shape_functions() exited
+        return _original_shape_function(coords, gauss_point)
+    coords_key = coords.tobytes()
+    by_point = cache.get(coords_key)
+    if by_point is None:
+        N, B, j = batched_shape_functions(coords, _gauss_points)
+        by_point = {
+            point_key: (N[idx], B[idx], j[idx]) for idx, point_key in enumerate(_gauss_point_keys)
+        }
+        cache[coords_key] = by_point
+    result = by_point.get(gauss_point.tobytes())
+    if result is None:
+        return _original_shape_function(coords, gauss_point)
+    return result
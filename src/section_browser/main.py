@@ -1,19 +1,32 @@
 from typing import Optional
 from dataclasses import dataclass
-import json
 import pathlib
+from collections import deque
+import subprocess
+import sys
+import time
+import numpy as np
 import pandas as pd
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
+from rich.live import Live
 from rich import print
 import typer
 import section_browser.w_sections as wsec
+from section_browser import session
+from section_browser import profiling
+from section_browser import batch
+from section_browser import daemon
+from section_browser import exporter
 
 DATA_STORE_FILE = pathlib.Path(__file__).parents[0] / "DATA_STORE.json"
+RESULTS_STORE_FILE = pathlib.Path(__file__).parents[0] / "RESULTS_STORE.jsonl"
 ROW_SELECTIONS: list[int] = []
 DATA_STORE: dict = {}
+PAGE_SIZE = 50
+LIVE_ROWS = 15
 
 APP_INTRO = typer.style(
     """
@@ -28,6 +41,11 @@ app = typer.Typer(
     no_args_is_help=True,
     help=APP_INTRO,
 )
+daemon_app = typer.Typer(
+    no_args_is_help=True,
+    help="Keep the analysis stack, catalog and analyzed sections warm in a background process",
+)
+app.add_typer(daemon_app, name="daemon")
 
 
 @app.command(
@@ -36,18 +54,17 @@ app = typer.Typer(
     help="Starts with a new database and applies optional filters based on column names",
     context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
 )
-def all_sections(ctx: typer.Context) -> pd.DataFrame:
+def all_sections(ctx: typer.Context, k: int = wsec.NEAREST_K) -> pd.DataFrame:
     """
-    Clears the data store file and loads all rows from the
-    aisc db into the data store.
+    Replaces the selection in the data store with all rows from the
+    aisc db (named snapshots are kept and 'undo' restores the previous selection).
 
-    Applies initial filters supplied in kwargs.
+    Applies initial filters supplied in kwargs. 'k' is as described in 'filter'.
     """
     kwargs = _parse_kwargs(ctx.args)
-    _clear_data_store()
     aisc_full_df = wsec.load_aisc_w_sections()
     loads = {}
-    current_selection = _apply_all_filters(aisc_full_df, kwargs)
+    current_selection = _apply_all_filters(aisc_full_df, kwargs, k=k)
     _set_current_indexes(list(current_selection.index), kwargs, loads)
     print(
         _table_output(
@@ -61,21 +78,26 @@ def all_sections(ctx: typer.Context) -> pd.DataFrame:
 
 @app.command(
     name="filter",
-    short_help="Applies filters. Valid operators include >, <, >=, <=, ==, !=, @ (approx equal)",
+    short_help="Applies filters. Valid operators include >, <, >=, <=, ==, !=, @ (nearest), lower..upper (range) and | (or)",
     context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
 )
-def filter_sections(ctx: typer.Context) -> pd.DataFrame:
+def filter_sections(ctx: typer.Context, k: int = wsec.NEAREST_K) -> pd.DataFrame:
     """
     Clears the data store file and loads all rows from the
     aisc db into the data store.
 
     Applies initial filters supplied in kwargs.
+
+    Fields given as "@value" select the 'k' sections nearest to all of those
+    values at once, ranked by distance (see wsec.nearest_sections). A field given
+    as "@value1|@value2" selects the sections nearest to either value. "@" terms
+    cannot be combined with other terms of the same field.
     """
     kwargs = _parse_kwargs(ctx.args)
     aisc_full_df = wsec.load_aisc_w_sections()
     current_indexes, prev_kwargs, loads = _get_current_indexes()
     current_selection = aisc_full_df.iloc[current_indexes]
-    current_selection = _apply_all_filters(current_selection, kwargs)
+    current_selection = _apply_all_filters(current_selection, kwargs, k=k)
     prev_kwargs.update(kwargs)
     _set_current_indexes(list(current_selection.index), prev_kwargs, loads)
     title = "AISC W-Sections: Current selection"
@@ -85,9 +107,117 @@ def filter_sections(ctx: typer.Context) -> pd.DataFrame:
     )
 
 
+@app.command(
+    name="save",
+    short_help="Save the current selection as a named snapshot",
+)
+def save_snapshot(name: str) -> None:
+    """
+    Returns None, saves the current selection and its filters as the snapshot 'name'
+    (replacing any snapshot with the same name).
+    """
+    json_data = session.read_session(DATA_STORE_FILE)
+    json_data["snapshots"][name] = {
+        "selection": json_data["selection"],
+        "filters": json_data["filters"],
+    }
+    session.write_json_atomic(DATA_STORE_FILE, json_data)
+    n_sections = len(session.decode_selection(json_data["selection"]))
+    print(f"Saved {n_sections} sections as {name!r}")
+
+
+@app.command(
+    name="load",
+    short_help="Replace the current selection with a named snapshot",
+)
+def load_snapshot(name: str) -> None:
+    """
+    Returns None, replaces the current selection with the snapshot 'name' (see 'save').
+    The applied loads are kept.
+    """
+    snapshot = _get_snapshot(name)
+    _, _, loads = _get_current_indexes()
+    indexes = session.decode_selection(snapshot["selection"])
+    _set_current_indexes(indexes, snapshot["filters"], loads)
+    _print_selection(indexes, snapshot["filters"], loads)
+
+
+@app.command(
+    name="union",
+    short_help="Add the sections of named snapshots to the current selection",
+)
+def union_snapshots(names: list[str]) -> None:
+    """
+    Returns None, adds the sections in each of the snapshots 'names' to the current selection.
+    """
+    _combine_with_snapshots(names, "union")
+
+
+@app.command(
+    name="intersect",
+    short_help="Keep only the sections of the current selection that are in named snapshots",
+)
+def intersect_snapshots(names: list[str]) -> None:
+    """
+    Returns None, keeps only the sections of the current selection that are in every one of
+    the snapshots 'names'.
+    """
+    _combine_with_snapshots(names, "intersect")
+
+
+@app.command(
+    name="diff",
+    short_help="Remove the sections of named snapshots from the current selection",
+)
+def diff_snapshots(names: list[str]) -> None:
+    """
+    Returns None, removes the sections in each of the snapshots 'names' from the current
+    selection.
+    """
+    _combine_with_snapshots(names, "diff")
+
+
+@app.command(
+    name="snapshots",
+    short_help="List the named snapshots",
+)
+def list_snapshots() -> None:
+    """
+    Returns None, lists the saved snapshots with their number of sections and filters.
+    """
+    json_data = session.read_session(DATA_STORE_FILE)
+    if not json_data["snapshots"]:
+        print("There are no snapshots: save one with 'save'")
+    for name, snapshot in json_data["snapshots"].items():
+        n_sections = len(session.decode_selection(snapshot["selection"]))
+        print(f"{name}: {n_sections} sections {snapshot['filters']}")
+
+
+@app.command(
+    name="undo",
+    short_help="Restore the selection, filters and loads from before the last change",
+)
+def undo() -> None:
+    """
+    Returns None, restores the session to its state before the last command that changed
+    the selection, filters or loads.
+    """
+    json_data = session.read_session(DATA_STORE_FILE)
+    if not json_data["history"]:
+        print("Nothing to undo")
+        raise typer.Exit(code=1)
+    json_data.update(json_data["history"].pop())
+    session.write_json_atomic(DATA_STORE_FILE, json_data)
+    _print_selection(
+        session.decode_selection(json_data["selection"]),
+        json_data["filters"],
+        json_data["loads"],
+    )
+
+
 @app.command(
     name="apply",
-    short_help="Apply loads to sections: n, vx, vy, mx, my, t (scale to N, N-mm)",
+    short_help="Apply loads to sections: n, vx, vy, mx, my, t (scale to N, N-mm) or a --table of load combinations",
 )
 def apply_loads(
     n: Optional[float] = None,
@@ -96,9 +226,15 @@ def apply_loads(
     vx: Optional[float] = None,
     vy: Optional[float] = None,
     t: Optional[float] = None,
+    table: Optional[pathlib.Path] = None,
 ) -> None:
     """
     Returns None, adds the loads supplied to the data store
+
+    'table' is the path to a CSV file of load combinations with one row per
+    combination and columns named after the actions (N, Mx, My, Vx, Vy, T)
+    and an optional "case" column naming each combination. If provided, the
+    combinations replace the individual loads.
     """
     actions = ["N", "Mx", "My", "Vx", "Vy", "T"]
     args = locals()
@@ -106,6 +242,8 @@ def apply_loads(
     for action in actions:
         if args[action.lower()] is not None:
             loads[action] = args[action.lower()]
+    if table is not None:
+        loads = _read_load_cases(table)
     indexes, filters, prev_loads = _get_current_indexes()
     aisc_full_df = wsec.load_aisc_w_sections()
     current_selection = aisc_full_df.iloc[indexes]
@@ -118,23 +256,413 @@ def apply_loads(
     name="maxvm",
     short_help="Calculate maximum von Mises stress on selected sections resulting from applied loads",
 )
-def calculate_max_vm(subslice: str) -> None:
+def calculate_max_vm(
+    subslice: str,
+    cache: bool = True,
+    jobs: int = 1,
+    table: Optional[pathlib.Path] = None,
+    screen: bool = False,
+    profile: Optional[pathlib.Path] = None,
+    profile_memory: bool = False,
+    critical_points: bool = False,
+    tol: Optional[float] = None,
+    template_mesh: bool = False,
+    approx: bool = False,
+    page: int = 1,
+    page_size: int = PAGE_SIZE,
+) -> None:
     """
     Returns None, calculates the max von Mises stress for the selected sections resulting from applied
     loads.
     'sub_slice' is a str that represents a Python numeric index slice of rows, i.e. "start:stop:step" that,
     if present, will be applied to the selection prior to calculating the stress.
+    'cache' controls whether analyzed sections and the results of previous runs are re-used.
+    'jobs' is the number of processes used to analyze the sections in parallel.
+    'table' is the path to a CSV file of load combinations (see 'apply') to use
+    instead of the applied loads. When there are load combinations, the governing
+    combination is reported for each section.
+    'screen' resolves the sections that are clearly over- or under-stressed with a
+    thin-walled beam theory estimate and only analyzes the remaining sections with FEA.
+    The estimate is calibrated against FEA at mesh sizes of 20 to 400 with a 5% margin.
+    'profile' is the path of a JSON or CSV file to write the time spent (and, with
+    'profile_memory', the peak memory used) in each stage of the analysis of each section.
+    'critical_points' recovers the stresses only at the few nodes of each section where the
+    maximum von Mises stress can occur (an estimate within about 1% of the full-field result).
+    'tol' meshes each section finer until its maximum von Mises stress changes by less than
+    'tol' (e.g. 0.01 for 1%) instead of using a fixed mesh size.
+    'template_mesh' morphs a template mesh onto each section instead of running the mesher
+    (see 'template-check' for how closely the results agree).
+    'approx' estimates the stresses from the surrogate model in well under a second,
+    without any FEA, with bounds on the FEA result (see 'retrain').
+    'page' and 'page_size' select which rows of the results are displayed. The latest
+    results are shown as they are analyzed and only the rows of 'page' are kept.
+    """
+    recorder = profiling.StageRecorder()
+    if profile is not None:
+        profiling.add_hook(recorder, track_memory=profile_memory)
+    try:
+        aisc_full_df = wsec.load_aisc_w_sections()
+        current_indexes, filters, loads = _get_current_indexes()
+        if table is not None:
+            loads = _read_load_cases(table)
+        current_selection = aisc_full_df.iloc[current_indexes]
+        parsed_slice = _parse_slice(subslice)
+        analysis_selection = current_selection.loc[parsed_slice]
+        n_rows = len(analysis_selection)
+        start, stop = _page_bounds(n_rows, page, page_size)
+        results_store = session.ResultsStore(RESULTS_STORE_FILE) if cache else None
+        if approx:
+            if isinstance(loads, list):
+                load_cases = pd.DataFrame(loads)
+            else:
+                load_cases = pd.DataFrame([wsec.normalize_loads(loads)])
+            try:
+                model = wsec.load_surrogate()
+            except FileNotFoundError:
+                print("There is no surrogate model: run 'retrain' first")
+                raise typer.Exit(code=1)
+            if str(model["catalog_hash"]) != wsec.catalog.catalog_hash(wsec.AISC_W_SECTIONS_FILE):
+                print("The catalog has changed since the surrogate model was trained: run 'retrain'")
+            analyzed_selection = wsec.calculate_approx_stresses(
+                analysis_selection, fy=350, load_cases=load_cases, model=model
+            )
+            if not isinstance(loads, list):
+                analyzed_selection = analyzed_selection.drop(columns="Governing case")
+        elif screen:
+            if isinstance(loads, list):
+                load_cases = pd.DataFrame(loads)
+            else:
+                load_cases = pd.DataFrame([wsec.normalize_loads(loads)])
+            analyzed_selection = wsec.calculate_screened_stresses(
+                analysis_selection,
+                fy=350,
+                load_cases=load_cases,
+                use_cache=cache,
+                workers=jobs,
+                results_store=results_store,
+                critical_points=critical_points,
+                tol=tol,
+                template=template_mesh,
+            )
+            if not isinstance(loads, list):
+                analyzed_selection = analyzed_selection.drop(columns="Governing case")
+            n_fea = (analyzed_selection["Method"] == "FEA").sum()
+            print(
+                f"Resolved {len(analyzed_selection) - n_fea} sections analytically "
+                f"and {n_fea} by FEA"
+            )
+        elif isinstance(loads, list):
+            analyzed_rows = wsec.iter_load_combination_rows(
+                analysis_selection,
+                fy=350,
+                load_cases=pd.DataFrame(loads),
+                use_cache=cache,
+                workers=jobs,
+                results_store=results_store,
+                critical_points=critical_points,
+                tol=tol,
+                template=template_mesh,
+            )
+        else:
+            analyzed_rows = wsec.iter_section_stresses(
+                analysis_selection,
+                fy=350,
+                use_cache=cache,
+                workers=jobs,
+                results_store=results_store,
+                critical_points=critical_points,
+                tol=tol,
+                template=template_mesh,
+                **wsec.normalize_loads(loads),
+            )
+        title = "AISC W-Sections: Current selection with analysis"
+        if approx or screen:
+            analyzed_page = analyzed_selection.iloc[start:stop]
+        else:
+            analyzed_page = _collect_page(analyzed_rows, n_rows, start, stop)
+        print(_table_output(analyzed_page, title=title, filters=filters, loads=loads))
+        if n_rows > page_size:
+            print(
+                f"Showing rows {start + 1}-{stop} of {n_rows} "
+                f"(page {page} of {-(-n_rows // page_size)}, see --page)"
+            )
+    finally:
+        if profile is not None:
+            profiling.remove_hook(recorder)
+    if profile is not None:
+        recorder.export(profile)
+        if recorder.records:
+            print(Panel(str(recorder.summary().head(10)), title="Slowest sections (s)"))
+        print(f"Wrote {len(recorder.records)} stage timings to {profile}")
+
+
+@app.command(
+    name="pareto",
+    short_help="Display the sections of the selection that are not dominated in weight versus other properties",
+)
+def pareto_sections(
+    minimize: str = "W",
+    maximize: str = "Zx",
+    dcr: bool = False,
+) -> None:
+    """
+    Returns None, displays the sections of the current selection that no other
+    section beats in every objective (the Pareto front), lightest first by default.
+    'minimize' and 'maximize' are comma-separated fields, e.g. --minimize W --maximize Zx,Iy.
+    'dcr' adds minimizing the DCR stress under the applied loads as an objective, using the
+    results stored by previous 'maxvm' runs. Sections without a stored result are left out.
     """
     aisc_full_df = wsec.load_aisc_w_sections()
     current_indexes, filters, loads = _get_current_indexes()
     current_selection = aisc_full_df.iloc[current_indexes]
-    parsed_slice = _parse_slice(subslice)
-    analysis_selection = current_selection.loc[parsed_slice]
-    analyzed_selection = wsec.calculate_section_stresses(
-        analysis_selection, fy=350, **loads
+    objectives = {field.strip(): "min" for field in minimize.split(",") if field.strip()}
+    objectives.update(
+        {field.strip(): "max" for field in maximize.split(",") if field.strip()}
+    )
+    if dcr:
+        current_selection = _add_stored_results(current_selection, loads)
+        if "DCR stress" not in current_selection.columns:
+            print("No stored results for the applied loads: run 'maxvm' first")
+            raise typer.Exit(code=1)
+        objectives["DCR stress"] = "min"
+    front_selection = wsec.pareto_front(current_selection, objectives)
+    objective_names = ", ".join(
+        f"{sense} {field}" for field, sense in objectives.items()
+    )
+    print(f"{len(front_selection)} of {len(current_selection)} sections are not dominated")
+    title = f"AISC W-Sections: Pareto front ({objective_names})"
+    print(_table_output(front_selection, title=title, filters=filters, loads=loads))
+
+
+@app.command(
+    name="retrain",
+    short_help="Train the surrogate model used by 'maxvm --approx' on the whole catalog",
+)
+def retrain_surrogate(
+    cache: bool = True,
+    jobs: int = 1,
+    mesh_size: float = 100,
+) -> None:
+    """
+    Returns None, analyzes every section in the catalog at 'mesh_size' and saves the
+    surrogate model that 'maxvm --approx' estimates stresses with in the section cache
+    directory, where it replaces the model shipped with the package.
+    Run it when the catalog or the mesh settings change.
+    'cache' and 'jobs' are as described in 'maxvm'.
+    """
+    aisc_full_df = wsec.load_aisc_w_sections()
+    start = time.perf_counter()
+    model = wsec.train_surrogate(
+        aisc_full_df, mesh_size=mesh_size, use_cache=cache, workers=jobs
+    )
+    wsec.save_surrogate(model)
+    n_missing = len(aisc_full_df) - len(model["Section"])
+    print(
+        f"Trained the surrogate model on {len(model['Section'])} sections "
+        f"in {time.perf_counter() - start:.0f} s ({n_missing} failed to analyze)"
     )
-    title = "AISC W-Sections: Current selection with analysis"
-    print(_table_output(analyzed_selection, title=title, filters=filters, loads=loads))
+    print(
+        f"Largest underestimate {model['underestimate'].max():.2%}, "
+        f"largest overestimate {model['overestimate'].max():.2%}"
+    )
+    print(f"Saved to {wsec.surrogate_path()}")
+
+
+@app.command(
+    name="template-check",
+    short_help="Compare sections meshed from a template mesh with freshly meshed sections",
+)
+def check_template_meshes(
+    subslice: str,
+    cache: bool = True,
+    mesh_size: float = 100,
+) -> None:
+    """
+    Returns None, analyzes the selected sections both with a template mesh (see
+    'maxvm --template-mesh') and with a fresh mesh and prints the relative difference
+    of their properties and of the maximum von Mises stress under each unit action.
+    'sub_slice' is as described in 'maxvm'.
+    'cache' controls whether analyzed sections are re-used from the on-disk section cache.
+    """
+    aisc_full_df = wsec.load_aisc_w_sections()
+    current_indexes, filters, loads = _get_current_indexes()
+    current_selection = aisc_full_df.iloc[current_indexes]
+    analysis_selection = current_selection.loc[_parse_slice(subslice)]
+    section_cache = wsec.section_cache.default_cache() if cache else None
+    comparison_df = wsec.compare_template_meshes(
+        analysis_selection, mesh_size=mesh_size, cache=section_cache
+    )
+    print(
+        Panel(
+            comparison_df.to_string(index=False, float_format="{:+.2%}".format),
+            title=f"Template mesh vs. fresh mesh (mesh size {mesh_size:g})",
+        )
+    )
+    if not comparison_df.empty:
+        worst = comparison_df.loc[comparison_df["Max difference"].idxmax()]
+        print(f"Largest difference: {worst['Max difference']:.2%} ({worst['Section']})")
+
+
+@app.command(
+    name="optimize",
+    short_help="Find the lightest section in the selection with a DCR of at most 1.0 under the applied loads",
+)
+def optimize_selection(
+    cache: bool = True,
+    table: Optional[pathlib.Path] = None,
+    heuristic: bool = False,
+) -> None:
+    """
+    Returns None, finds the lightest section in the current selection that is adequate
+    for the applied loads (or the load combinations in 'table', see 'apply') while
+    analyzing as few sections with FEA as possible.
+    'cache' controls whether analyzed sections are re-used from the on-disk section cache.
+    Only sections that the screen proves inadequate are skipped without FEA. 'heuristic'
+    also skips sections no stronger than a lighter section that failed, which analyzes
+    fewer sections but can occasionally skip the lightest adequate one.
+    """
+    aisc_full_df = wsec.load_aisc_w_sections()
+    current_indexes, filters, loads = _get_current_indexes()
+    if table is not None:
+        loads = _read_load_cases(table)
+    current_selection = aisc_full_df.iloc[current_indexes]
+    if isinstance(loads, list):
+        load_cases = pd.DataFrame(loads)
+    else:
+        load_cases = pd.DataFrame([wsec.normalize_loads(loads)])
+    lightest_section, n_analyzed = wsec.lightest_adequate_section(
+        current_selection, fy=350, load_cases=load_cases, use_cache=cache, heuristic=heuristic
+    )
+    print(f"Analyzed {n_analyzed} of {len(current_selection)} sections with FEA")
+    if lightest_section is None:
+        print("No section in the current selection is adequate for the applied loads")
+        return
+    title = "AISC W-Sections: Lightest adequate section"
+    print(
+        _table_output(
+            pd.DataFrame([lightest_section]), title=title, filters=filters, loads=loads
+        )
+    )
+
+
+@app.command(
+    name="batch",
+    short_help="Run a job file of sections and load combinations, streaming the results to a CSV or Parquet file",
+)
+def run_batch(
+    job_file: pathlib.Path,
+    output: pathlib.Path,
+    cache: bool = True,
+    jobs: int = 1,
+    restart: bool = False,
+) -> None:
+    """
+    Returns None, calculates the max von Mises stress of every section in the
+    JSON 'job_file' under every load combination in it (see section_browser.batch)
+    and writes one row per section and combination to 'output' (CSV, or Parquet
+    if it ends in ".parquet") as soon as each section is analyzed.
+    An interrupted run of the same job into the same 'output' resumes where it
+    stopped unless 'restart' is given.
+    'cache' and 'jobs' are as described in 'maxvm'.
+    """
+    job = batch.read_job(job_file)
+    aisc_full_df = wsec.load_aisc_w_sections()
+    results_store = session.ResultsStore(RESULTS_STORE_FILE) if cache else None
+    try:
+        results = batch.run_job(
+            job,
+            aisc_full_df,
+            output,
+            _apply_all_filters,
+            use_cache=cache,
+            workers=jobs,
+            results_store=results_store,
+            restart=restart,
+        )
+        for section_name, error, n_remaining in results:
+            status = f"[red]failed: {error}[/red]" if error else "done"
+            print(f"{section_name}: {status} ({n_remaining} remaining)")
+    except ImportError:
+        print("Writing Parquet files requires pyarrow: pip install pyarrow")
+        raise typer.Exit(code=1)
+    print(f"Results written to {output}")
+
+
+@app.command(
+    name="export",
+    short_help="Analyze the selected sections and stream the results to a CSV, Parquet or Excel file",
+)
+def export_results(
+    output: pathlib.Path,
+    subslice: str = ":",
+    cases: bool = False,
+    cache: bool = True,
+    jobs: int = 1,
+    table: Optional[pathlib.Path] = None,
+    critical_points: bool = False,
+    tol: Optional[float] = None,
+    template_mesh: bool = False,
+    chunk_rows: int = exporter.CHUNK_ROWS,
+) -> None:
+    """
+    Returns None, calculates the max von Mises stress of the selected sections under the
+    applied loads and writes the results to 'output' (".csv", ".parquet" or ".xlsx") in
+    chunks of 'chunk_rows' rows as the sections are analyzed, with one row per section as
+    in 'maxvm'. Rows are written in the order the sections finish.
+    'cases' writes one row per section and load combination instead (as in 'batch').
+    'subslice', 'cache', 'jobs', 'table', 'critical_points', 'tol' and 'template_mesh'
+    are as described in 'maxvm'.
+    """
+    aisc_full_df = wsec.load_aisc_w_sections()
+    current_indexes, filters, loads = _get_current_indexes()
+    if table is not None:
+        loads = _read_load_cases(table)
+    current_selection = aisc_full_df.iloc[current_indexes]
+    analysis_selection = current_selection.loc[_parse_slice(subslice)]
+    if isinstance(loads, list):
+        load_cases = pd.DataFrame(loads)
+    else:
+        load_cases = pd.DataFrame([wsec.normalize_loads(loads)])
+    results_store = session.ResultsStore(RESULTS_STORE_FILE) if cache else None
+    analysis_options = dict(
+        use_cache=cache,
+        workers=jobs,
+        results_store=results_store,
+        critical_points=critical_points,
+        tol=tol,
+        template=template_mesh,
+    )
+    if cases:
+        if "case" not in load_cases.columns:
+            load_cases["case"] = load_cases.index
+        results = wsec.iter_load_combinations(analysis_selection, load_cases, **analysis_options)
+        chunks = exporter.frame_chunks(
+            (
+                batch.result_rows(
+                    analysis_selection.iloc[position], load_cases, 350, max_vm_stresses, error
+                )
+                for position, max_vm_stresses, error, _ in results
+            ),
+            chunk_rows,
+        )
+    else:
+        rows = wsec.iter_load_combination_rows(
+            analysis_selection, fy=350, load_cases=load_cases, **analysis_options
+        )
+        if not isinstance(loads, list):
+            rows = (row.drop("Governing case") for _, row in rows)
+        else:
+            rows = (row for _, row in rows)
+        chunks = exporter.row_chunks(rows, chunk_rows)
+    try:
+        n_rows = exporter.export_chunks(chunks, output)
+    except ImportError:
+        print("Writing Parquet files requires pyarrow: pip install pyarrow")
+        raise typer.Exit(code=1)
+    except ValueError as err:
+        print(str(err))
+        raise typer.Exit(code=1)
+    print(f"Wrote {n_rows} rows for {len(analysis_selection)} sections to {output}")
 
 
 @app.command(
@@ -151,74 +679,209 @@ def display_table() -> None:
     aisc_full_df = wsec.load_aisc_w_sections()
     current_indexes, filters, loads = _get_current_indexes()
     current_selection = aisc_full_df.iloc[current_indexes]
+    current_selection = _add_stored_results(current_selection, loads)
     title = "AISC W-Sections: Current selection"
     print(_table_output(current_selection, title=title, filters=filters, loads=loads))
 
 
-def _apply_all_filters(current_selection: pd.DataFrame, kwargs: dict) -> None:
+@app.command(
+    name="clear-cache",
+    short_help="Remove all analyzed sections from the on-disk section cache",
+)
+def clear_cache() -> None:
     """
-    Returns None. Sets the indexes in the data store to the indexes remaining
-    in the 'current_selection' once all of the filter terms in 'kwargs' have
-    been applied.
+    Returns None, removes all entries from the on-disk section cache and all
+    stored analysis results.
     """
-    for field, comparison_value in kwargs.items():
-        current_selection = _apply_filter(current_selection, field, comparison_value)
+    section_cache = wsec.section_cache.default_cache()
+    n_bytes = section_cache.size_bytes()
+    section_cache.clear()
+    session.ResultsStore(RESULTS_STORE_FILE).clear()
+    print(f"Removed {n_bytes / 2**20:.1f} MB from {section_cache.path}")
+
+
+@daemon_app.command(
+    name="start",
+    short_help="Start the daemon that runs sectionbrowser commands",
+)
+def start_daemon(background: bool = False) -> None:
+    """
+    Returns None, runs the daemon until it is stopped. While it is running,
+    sectionbrowser commands are forwarded to it instead of running in a new process.
+    'background' starts the daemon in a detached process and returns once it is ready.
+    """
+    if daemon.is_running():
+        print(f"The daemon is already running at {daemon.socket_path()}")
+        return
+    if not background:
+        print(f"Listening on {daemon.socket_path()}")
+        daemon.serve(app)
+        return
+    subprocess.Popen(
+        [sys.executable, "-m", "section_browser.main", "daemon", "start"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    for _ in range(300):
+        if daemon.is_running():
+            print(f"Started the daemon at {daemon.socket_path()}")
+            return
+        time.sleep(0.1)
+    print("The daemon did not start")
+    raise typer.Exit(code=1)
+
+
+@daemon_app.command(
+    name="stop",
+    short_help="Stop the daemon",
+)
+def stop_daemon() -> None:
+    """
+    Returns None, stops the running daemon. Later commands run in-process.
+    """
+    if daemon.stop():
+        print("Stopped the daemon")
+    else:
+        print("The daemon is not running")
+
+
+@daemon_app.command(
+    name="status",
+    short_help="Report whether the daemon is running",
+)
+def daemon_status() -> None:
+    """
+    Returns None, reports whether the daemon is running.
+    """
+    if daemon.is_running():
+        print(f"The daemon is running at {daemon.socket_path()}")
+    else:
+        print("The daemon is not running")
+
+
+def _add_stored_results(
+    current_selection: pd.DataFrame,
+    loads,
+    path: pathlib.Path = RESULTS_STORE_FILE,
+    mesh_size: float = 100,
+) -> pd.DataFrame:
+    """
+    Returns 'current_selection' with "sig_vm Max" and "DCR stress" columns
+    added from the results stored by previous 'maxvm' runs for 'loads' (NaN
+    for sections that have not been analyzed). Returns 'current_selection'
+    unchanged if none of its sections have stored results.
+    """
+    if isinstance(loads, list):
+        load_cases = pd.DataFrame(loads)
+    else:
+        load_cases = pd.DataFrame([wsec.normalize_loads(loads)])
+    load_matrix = wsec.load_case_matrix(load_cases)
+    stored_stresses = session.ResultsStore(path).lookup(
+        current_selection, load_matrix, mesh_size
+    )
+    if np.isnan(stored_stresses).all():
+        return current_selection
+    current_selection = current_selection.copy()
+    # A section's result is only known if it is stored for every combination
+    current_selection["sig_vm Max"] = stored_stresses.max(axis=1)
+    current_selection["DCR stress"] = current_selection["sig_vm Max"] / 350
     return current_selection
 
 
-def _apply_filter(
-    current_selection: pd.DataFrame, field: str, comparison_value: str
+def _apply_all_filters(
+    current_selection: pd.DataFrame, kwargs: dict, k: int = wsec.NEAREST_K
 ) -> pd.DataFrame:
     """
-    Returns the indexes of the rows which pass the filter.
-
-    'field' is one of the fields (column names) in the aisc db
-    'comparison_value' is a str that may or may not contain both
-    a numerical comparison operator (<, >, <=, >=, ==, !=) and a numerical
-    value to compare against the records in the current rows of the
-    aisc db
-    """
-    operations_translate = {
-        ">": "ge",
-        "<": "le",
-        "@": "~=",
-        "~=": "~=",
-        "ge": "ge",
-        "le": "le",
-    }
-    operations = {
-        "le": wsec.section_filter,
-        "ge": wsec.section_filter,
-        "~=": wsec.sections_approx_equal,
+    Returns the rows of 'current_selection' that pass all of the filter terms
+    in 'kwargs', a dict of field (column name) to filter expression (see
+    _parse_filter_expression). All of the terms are evaluated in a single pass.
+    'k' is the number of nearest sections kept for "@" terms (see
+    wsec.filter_sections).
+    """
+    conditions = {
+        field: _parse_filter_expression(expression)
+        for field, expression in kwargs.items()
     }
-    parsed_operator, value = _parse_comparison_value(comparison_value)
-    operator = operations_translate[parsed_operator]
-    operation_function = operations[operator]
-    updated_selection = operation_function(current_selection, operator, **{field: value})
-    return updated_selection
+    return wsec.filter_sections(current_selection, conditions, k=k)
+
+
+def _parse_filter_expression(expression: str) -> list[tuple]:
+    """
+    Returns a list of (operator, value) filter terms (see wsec.filter_mask)
+    parsed from 'expression'. Alternatives are separated by "|" and a range
+    is given as "lower..upper". A value without an operator is compared
+    for equality.
+
+    Examples:
+        _parse_filter_expression(">=300") # [(">=", 300.0)]
+        _parse_filter_expression("300..600") # [("..", (300.0, 600.0))]
+        _parse_filter_expression("@450|@600") # [("@", 450.0), ("@", 600.0)]
+    """
+    terms = []
+    for term in expression.split("|"):
+        term = term.strip()
+        if ".." in term:
+            low, high = term.split("..")
+            terms.append(("..", (_parse_filter_value(low), _parse_filter_value(high))))
+            continue
+        parsed = _parse_comparison_value(term)
+        if parsed is None:
+            terms.append(("==", _parse_filter_value(term)))
+        else:
+            terms.append(parsed)
+    return terms
+
+
+def _parse_filter_value(value: str) -> float:
+    """
+    Returns 'value' as a float or raises ValueError.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Cannot perform filtering based on the following input: {value=}")
 
 
 def _parse_comparison_value(comparison_value: str) -> tuple[str, float]:
     """
     Returns a tuple containing a string of the comparison operator followed
-    by the comparison value. If no comparison operator is present, then an
-    empty string will occupy the first position of the tuple.
+    by the comparison value. If no comparison operator is present, then
+    None is returned.
 
     Examples:
-        _parse_comparison_value("<=234") # ("<=", 234.0
-        _parse_comparison_value("234") # (None, 234.0)
+        _parse_comparison_value("<=234") # ("<=", 234.0)
+        _parse_comparison_value("234") # None
         _parse_comparison_value("==312") # ("==", 312.0)
+        _parse_comparison_value("=312") # ("==", 312.0)
     """
-    operators = "~= <= >= < > = @ ge le".split()
+    operators = "~= <= >= == != < > = @ ge le".split()
     for operator in operators:
-        if operator in comparison_value:
+        if comparison_value.startswith(operator):
+            value = comparison_value[len(operator):]
             try:
-                return operator, float(comparison_value.split(operator)[-1])
-            except:
-                attempted_value = comparison_value.split(operator)[-1]
+                parsed_value = float(value)
+            except ValueError:
                 raise ValueError(
-                    f"Cannot perform filtering based on the following input: {operator=} {attempted_value=}"
+                    f"Cannot perform filtering based on the following input: {operator=} attempted_value={value!r}"
                 )
+            if operator == "=":
+                operator = "=="
+            return operator, parsed_value
+
+
+def _read_load_cases(path: pathlib.Path) -> list[dict]:
+    """
+    Returns a list of load combinations, one dict of actions per row of the
+    CSV file at 'path'. Blank cells are omitted from the combination.
+    """
+    load_cases_df = pd.read_csv(path)
+    wsec.load_case_matrix(load_cases_df)  # Validates the column names
+    return [
+        {action: value for action, value in record.items() if pd.notna(value)}
+        for record in load_cases_df.to_dict(orient="records")
+    ]
 
 
 def _parse_slice(slice_arg: str) -> slice:
@@ -276,33 +939,125 @@ def _parse_kwargs(extra_args: list[str]):
     return kwargs
 
 
+def _get_snapshot(name: str, path: pathlib.Path = DATA_STORE_FILE) -> dict:
+    """
+    Returns the snapshot 'name' in the data store or exits if there is none.
+    """
+    snapshots = session.read_session(path)["snapshots"]
+    if name not in snapshots:
+        print(f"There is no snapshot named {name!r} (saved: {', '.join(snapshots) or 'none'})")
+        raise typer.Exit(code=1)
+    return snapshots[name]
+
+
+def _combine_with_snapshots(
+    names: list[str], operation: str, path: pathlib.Path = DATA_STORE_FILE
+) -> None:
+    """
+    Returns None. Replaces the current selection with the result of
+    'operation' (see session.combine_selections) applied to it and each of
+    the snapshots 'names' in turn, and prints it.
+    """
+    snapshots = [_get_snapshot(name, path) for name in names]
+    indexes, filters, loads = _get_current_indexes(path)
+    bits = session.selection_bits(indexes)
+    for snapshot in snapshots:
+        bits = session.combine_selections(
+            bits, session.decode_bits(snapshot["selection"]), operation
+        )
+    indexes = session.selection_indexes(bits)
+    description = f"{operation} {', '.join(names)}"
+    if "selection" in filters:
+        description = f"{filters['selection']}, {description}"
+    filters = {**filters, "selection": description}
+    _set_current_indexes(indexes, filters, loads, path)
+    _print_selection(indexes, filters, loads)
+
+
+def _print_selection(indexes: list[int], filters: dict, loads) -> None:
+    """
+    Returns None. Prints the table of the catalog rows at 'indexes'.
+    """
+    aisc_full_df = wsec.load_aisc_w_sections()
+    title = "AISC W-Sections: Current selection"
+    print(_table_output(aisc_full_df.iloc[indexes], title=title, filters=filters, loads=loads))
+
+
 def _clear_data_store(path: pathlib.Path = DATA_STORE_FILE) -> None:
     """
-    Removes all data in the data store file leaving an empty json file.
+    Removes all data in the data store file (including the snapshots and the
+    undo history) leaving an empty session.
     """
-    json_data = {"indexes": [], "filters": {}, "loads": {}}
-    with open(path, "w") as file:
-        json.dump(json_data, file)
+    json_data = {
+        "selection": session.encode_selection([]),
+        "filters": {},
+        "loads": {},
+        "snapshots": {},
+        "history": [],
+    }
+    session.write_json_atomic(path, json_data)
 
 
 def _set_current_indexes(
     indexes: list[int], filters: dict, loads: dict, path: pathlib.Path = DATA_STORE_FILE
 ) -> None:
     """
-    Stores the list of indexes into the data store file
+    Stores the list of indexes into the data store file (as a bitset, see
+    section_browser.session). The previous selection can be restored with 'undo'.
     """
-    json_data = {"indexes": indexes, "filters": filters, "loads": loads}
-    with open(path, "w") as file:
-        json.dump(json_data, file)
+    session.update_session(path, indexes, filters, loads)
 
 
 def _get_current_indexes(path: pathlib.Path = DATA_STORE_FILE) -> list[int]:
     """
     Returns the list of indexes currently in the data store.
     """
-    with open(path, "r") as file:
-        json_data = json.load(file)
-    return json_data["indexes"], json_data["filters"], json_data["loads"]
+    json_data = session.read_session(path)
+    return session.decode_selection(json_data["selection"]), json_data["filters"], json_data["loads"]
+
+
+def _page_bounds(n_rows: int, page: int, page_size: int) -> tuple[int, int]:
+    """
+    Returns a tuple of the start and stop positions of the rows on 'page'
+    (numbered from 1) of 'n_rows' rows split into pages of 'page_size' rows.
+    Raises typer.BadParameter if there is no such page.
+    """
+    if page_size < 1:
+        raise typer.BadParameter("--page-size must be at least 1")
+    n_pages = max(1, -(-n_rows // page_size))
+    if not 1 <= page <= n_pages:
+        raise typer.BadParameter(f"--page must be between 1 and {n_pages}")
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows)
+
+
+def _collect_page(analyzed_rows, n_rows: int, start: int, stop: int) -> pd.DataFrame:
+    """
+    Returns a DataFrame of the rows at the positions 'start' to 'stop' of the
+    (position, row) tuples yielded by 'analyzed_rows' (see
+    wsec.iter_load_combination_rows). While the 'n_rows' rows are analyzed, a
+    live table of the latest LIVE_ROWS rows is displayed. Only the rows of the
+    page are kept, so memory does not grow with the size of the selection.
+    """
+    page_rows = {}
+    latest_rows = deque(maxlen=LIVE_ROWS)
+    n_analyzed = 0
+    with Live(transient=True, refresh_per_second=4) as live:
+        for position, row in analyzed_rows:
+            n_analyzed += 1
+            if start <= position < stop:
+                page_rows[position] = row
+            latest_rows.append(row)
+            live.update(
+                Panel(
+                    _create_table(pd.DataFrame(list(latest_rows))),
+                    title=f"Analyzed {n_analyzed} of {n_rows} sections",
+                )
+            )
+    page_df = pd.DataFrame([page_rows[position] for position in sorted(page_rows)])
+    if "error" in page_df.columns and not page_df["error"].any():
+        page_df = page_df.drop(columns="error")
+    return page_df
 
 
 def _create_table(
@@ -320,21 +1075,25 @@ def _create_table(
     show "..."
     """
     table = Table()
-    display_df = df.drop(["Type", "kdes"], axis=1)
+    display_df = df.drop(["Type", "kdes"], axis=1, errors="ignore")
     # Columns
-    column_names = display_df.columns
-    if n_cols is not None and len(column_names) < n_cols:
-        column_names = display_df.columns[:n_cols]
+    truncate_cols = n_cols is not None and len(display_df.columns) > n_cols
+    truncate_rows = n_rows is not None and len(display_df) > n_rows
+    if truncate_cols:
+        display_df = display_df.iloc[:, :n_cols]
+    if truncate_rows:
+        display_df = display_df.iloc[:n_rows]
     table.add_column("index", justify="left")
-    for column_name in display_df.columns[:n_cols]:
+    for column_name in display_df.columns:
         table.add_column(column_name, justify="center")
+    if truncate_cols:
+        table.add_column("...", justify="center")
 
     # Rows
-    row_indexes = display_df.index
-    if n_rows is not None and len(row_indexes) < n_rows:
-        row_indexes = display_df.index[:n_rows]
     for record in display_df.itertuples():
-        table.add_row(*[str(value) for value in record])
+        table.add_row(*[str(value) for value in record], *(["..."] if truncate_cols else []))
+    if truncate_rows:
+        table.add_row(*["..."] * len(table.columns))
 
     return table
 
@@ -351,6 +1110,8 @@ def _table_output(
     Returns a rich.panel.Panel populated with a rich.table.Table
     containing the information within 'df'
     """
+    if isinstance(loads, list):
+        loads = f"{len(loads)} load combinations"
     subtitle_filters = Text(f"{filters}")
     subtitle_loads = Text(f"{loads}", style="bold red")
     if subtitle_loads != "":
@@ -360,4 +1121,4 @@ def _table_output(
 
 
 if __name__ == "__main__":
-    app()
+    daemon.run()
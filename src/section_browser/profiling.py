@@ -0,0 +1,188 @@
+"""
+Per-section, per-stage timing instrumentation of the w_sections analysis
+pipeline.
+
+Each instrumented stage (see STAGES) produces a record dict:
+    {"Section", "mesh_size", "stage", "seconds", "elements", "peak_memory"}
+that is passed to every registered hook. Instrumentation costs nothing
+unless a hook is registered.
+
+e.g.
+    recorder = StageRecorder()
+    add_hook(recorder)
+    w_sections.calculate_section_stresses(sections_df, fy=350, Mx=100e6)
+    remove_hook(recorder)
+    recorder.to_csv("profile.csv")
+"""
+
+import json
+import pathlib
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable
+
+import pandas as pd
+
+STAGES = [
+    "cache",
+    "geometry",
+    "mesh",
+    "geometric_properties",
+    "warping",
+    "stress",
+    "critical_points",
+    "von_mises",
+]
+RECORD_FIELDS = ["Section", "mesh_size", "stage", "seconds", "elements", "peak_memory"]
+
+_hooks: list[Callable[[dict], None]] = []
+_track_memory = False
+
+
+def add_hook(hook: Callable[[dict], None], track_memory: bool = False) -> None:
+    """
+    Returns None. Registers 'hook' to be called with the record of every
+    instrumented stage. If 'track_memory' is True, the peak Python memory
+    allocated during each stage (in bytes, above the memory in use when the
+    stage started) is recorded (using tracemalloc, which slows
+    the analysis down).
+    """
+    global _track_memory
+    _hooks.append(hook)
+    if track_memory:
+        _track_memory = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def remove_hook(hook: Callable[[dict], None]) -> None:
+    """
+    Returns None. Unregisters 'hook'. Memory tracking stops once there are
+    no hooks left.
+    """
+    global _track_memory
+    _hooks.remove(hook)
+    if not _hooks and _track_memory:
+        _track_memory = False
+        tracemalloc.stop()
+
+
+def enabled() -> bool:
+    """
+    Returns True if any hooks are registered.
+    """
+    return bool(_hooks)
+
+
+def tracking_memory() -> bool:
+    """
+    Returns True if the peak memory of each stage is being recorded.
+    """
+    return _track_memory
+
+
+def emit(record: dict) -> None:
+    """
+    Returns None. Passes 'record' to all registered hooks (used to forward the
+    records of stages that ran in worker processes).
+    """
+    for hook in _hooks:
+        hook(record)
+
+
+@contextmanager
+def stage(name: str, section_name: str, mesh_size: float):
+    """
+    Context manager that times the stage 'name' of the analysis of the section
+    'section_name' and emits its record on exit. Yields the record so that the
+    stage can fill in the "elements" of the mesh.
+    """
+    if not _hooks:
+        yield {}
+        return
+    record = {
+        "Section": section_name,
+        "mesh_size": mesh_size,
+        "stage": name,
+        "seconds": None,
+        "elements": None,
+        "peak_memory": None,
+    }
+    if _track_memory:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        if _track_memory:
+            record["peak_memory"] = tracemalloc.get_traced_memory()[1] - start_memory
+        emit(record)
+
+
+class StageRecorder:
+    """
+    A hook that collects all of the records that it is called with.
+    """
+
+    def __init__(self):
+        self.records: list[dict] = []
+
+    def __call__(self, record: dict) -> None:
+        self.records.append(record)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame with one row per record.
+        """
+        return pd.DataFrame(self.records, columns=RECORD_FIELDS)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame of the total seconds spent in each stage by each
+        section, with a "total" column, sorted with the slowest section first.
+        """
+        records_df = self.to_dataframe()
+        summary_df = records_df.pivot_table(
+            index=["Section", "mesh_size"],
+            columns="stage",
+            values="seconds",
+            aggfunc="sum",
+            fill_value=0.0,
+        )
+        summary_df = summary_df.reindex(
+            columns=[stage for stage in STAGES if stage in summary_df.columns]
+        )
+        summary_df["total"] = summary_df.sum(axis=1)
+        return summary_df.sort_values("total", ascending=False)
+
+    def to_json(self, path: pathlib.Path) -> None:
+        """
+        Returns None. Writes the records to 'path' as a JSON list.
+        """
+        with open(path, "w") as file:
+            json.dump(self.records, file, indent=2, default=_json_default)
+
+    def to_csv(self, path: pathlib.Path) -> None:
+        """
+        Returns None. Writes the records to 'path' as CSV.
+        """
+        self.to_dataframe().to_csv(path, index=False)
+
+    def export(self, path: pathlib.Path) -> None:
+        """
+        Returns None. Writes the records to 'path' as JSON if its suffix is
+        ".json" and as CSV otherwise.
+        """
+        if pathlib.Path(path).suffix.lower() == ".json":
+            self.to_json(path)
+        else:
+            self.to_csv(path)
+
+
+def _json_default(value):
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot serialize {value!r}")
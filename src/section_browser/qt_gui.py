@@ -1,8 +1,12 @@
+import pathlib
 import sys
+import time
+import numpy as np
 import pandas as pd
-from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTableView, QHeaderView, QFileDialog, QProgressBar, QSpinBox
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
 from section_browser import w_sections as wsec
+from section_browser import exporter
 
 def launch_gui_app():
     app = QApplication(sys.argv)
@@ -10,9 +14,132 @@ def launch_gui_app():
     window.show()
     sys.exit(app.exec_())
 
+class DataFrameModel(QAbstractTableModel):
+    """
+    A table model that displays 'data_df' directly. Cells are formatted only
+    when the view asks for them and the unformatted values are available
+    through Qt.UserRole (used for sorting).
+    """
+    def __init__(self, data_df=None):
+        super().__init__()
+        self.set_dataframe(pd.DataFrame() if data_df is None else data_df)
+
+    def set_dataframe(self, data_df):
+        self.beginResetModel()
+        self.data_df = data_df.reset_index(drop=True)
+        self.columns = [self.data_df[column].to_numpy() for column in self.data_df.columns]
+        self.endResetModel()
+
+    def dataframe(self):
+        return self.data_df
+
+    def set_value(self, row, column_name, value):
+        column = self.data_df.columns.get_loc(column_name)
+        self.data_df.iat[row, column] = value
+        self.columns[column] = self.data_df[column_name].to_numpy()
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.data_df)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        value = self.columns[index.column()][index.row()]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if role == Qt.UserRole:
+            return value
+        if isinstance(value, float) and np.isnan(value):
+            return ""
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self.data_df.columns[section])
+        return str(section + 1)
+
+
+class VonMisesSignals(QObject):
+    # Row position in the table, max von Mises stress, error message
+    result = Signal(int, float, str)
+    # True if the calculation was cancelled
+    finished = Signal(bool)
+
+
+class VonMisesWorker(QRunnable):
+    """
+    Calculates the max von Mises stress of each section in 'sections_df' under
+    'loads' in a QThreadPool thread, emitting each result as soon as it is
+    calculated. Sections analyzed before are loaded from the section cache.
+    If 'tol' is given, each section is meshed until its stresses converge to
+    within 'tol' (see wsec.converged_mesh_size).
+    """
+    def __init__(self, sections_df, loads, tol=None):
+        super().__init__()
+        self.sections_df = sections_df
+        self.loads = loads
+        self.tol = tol
+        self.signals = VonMisesSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        # Takes effect once the section currently being analyzed is finished
+        self.cancelled = True
+
+    def run(self):
+        for position in range(len(self.sections_df)):
+            if self.cancelled:
+                break
+            analyzed_df = wsec.calculate_section_stresses(
+                self.sections_df.iloc[[position]], fy=350, tol=self.tol, **self.loads
+            )
+            error = analyzed_df["error"].iloc[0] if "error" in analyzed_df.columns else ""
+            self.signals.result.emit(position, float(analyzed_df["sig_vm Max"].iloc[0]), error)
+        self.signals.finished.emit(self.cancelled)
+
+
+class ExportSignals(QObject):
+    # Number of rows written, error message
+    finished = Signal(int, str)
+
+
+class ExportWorker(QRunnable):
+    """
+    Writes 'data_df' to 'filename' in chunks (see exporter.ResultExporter) in
+    a QThreadPool thread so that the window stays responsive.
+    """
+    def __init__(self, data_df, filename):
+        super().__init__()
+        self.data_df = data_df
+        self.filename = filename
+        self.signals = ExportSignals()
+
+    def run(self):
+        try:
+            n_rows = exporter.export_dataframe(self.data_df, self.filename)
+        except (ImportError, OSError, ValueError) as err:
+            self.signals.finished.emit(0, str(err) or type(err).__name__)
+            return
+        self.signals.finished.emit(n_rows, "")
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.thread_pool = QThreadPool.globalInstance()
+        self.worker = None
+        self.export_worker = None
         self.setWindowTitle("SectionBrowser - AISC W-sections")
         self.setGeometry(100, 100, 800, 600)
 
@@ -43,14 +170,28 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(top_widget)
 
         # Create the output section (datatable)
-        self.table = QTableWidget(20, 15)
-        self.table.setHorizontalHeaderLabels(["Column 1", "Column 2", "Column 3", "Column 4", "Column 5",
-                                              "Column 6", "Column 7", "Column 8", "Column 9", "Column 10",
-                                              "Column 11", "Column 12", "Column 13", "Column 14", "Column 15"])
+        self.model = DataFrameModel(pd.DataFrame(columns=[f"Column {idx}" for idx in range(1, 16)]))
+        self.proxy_model = QSortFilterProxyModel()
+        self.proxy_model.setSourceModel(self.model)
+        self.proxy_model.setSortRole(Qt.UserRole)
+        self.proxy_model.setFilterKeyColumn(-1)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.table = QTableView()
+        self.table.setModel(self.proxy_model)
+        self.table.setSortingEnabled(True)
         self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         main_layout.addWidget(self.table)
 
+        # Create the filter of the rows shown in the datatable
+        filter_widget = QWidget()
+        filter_layout = QHBoxLayout(filter_widget)
+        self.filter_field = QLineEdit()
+        self.filter_field.textChanged.connect(self.proxy_model.setFilterFixedString)
+        filter_layout.addWidget(QLabel("Filter"))
+        filter_layout.addWidget(self.filter_field)
+        main_layout.addWidget(filter_widget)
+
         # Create the bottom buttons
         button_widget = QWidget()
         button_layout = QHBoxLayout(button_widget)
@@ -59,6 +200,15 @@ class MainWindow(QMainWindow):
         # Add the buttons to the main layout
         main_layout.addWidget(button_widget)
 
+        # Create the progress bar for the von Mises calculation
+        progress_widget = QWidget()
+        progress_layout = QHBoxLayout(progress_widget)
+        self.progress_bar = QProgressBar()
+        self.progress_label = QLabel("")
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_label)
+        main_layout.addWidget(progress_widget)
+
     def create_input_fields(self, layout, title):
         fields = []
         if title == "Input 1":
@@ -76,16 +226,31 @@ class MainWindow(QMainWindow):
 
     def create_buttons(self, layout):
         layout.addStretch()
+        self.tol_field = QLineEdit()
+        self.tol_field.setPlaceholderText("fixed mesh")
+        layout.addWidget(QLabel("Mesh tolerance"))
+        layout.addWidget(self.tol_field)
+        self.k_field = QSpinBox()
+        self.k_field.setRange(1, 1000)
+        self.k_field.setValue(wsec.NEAREST_K)
+        layout.addWidget(QLabel("Nearest sections"))
+        layout.addWidget(self.k_field)
         load_data_button = QPushButton("Load Data")
         calculate_button = QPushButton("Calculate Max von Mises")
-        export_button = QPushButton("Export to Excel")
+        cancel_button = QPushButton("Cancel")
+        export_button = QPushButton("Export")
+        cancel_button.setEnabled(False)
         layout.addWidget(load_data_button)
         layout.addWidget(calculate_button)
+        layout.addWidget(cancel_button)
         layout.addWidget(export_button)
 
         load_data_button.clicked.connect(self.load_data)
         calculate_button.clicked.connect(self.calculate_von_mises)
+        cancel_button.clicked.connect(self.cancel_von_mises)
         export_button.clicked.connect(self.export_to_excel)
+        self.busy_buttons = [load_data_button, calculate_button, export_button]
+        self.cancel_button = cancel_button
 
     def load_data(self):
         # filename, _ = QFileDialog.getOpenFileName(self, "Load CSV", "", "CSV Files (*.csv)")
@@ -100,7 +265,7 @@ class MainWindow(QMainWindow):
                     filters.update({field_name: input_value})
                 except ValueError:
                     pass
-            filtered_df = wsec.sections_approx_equal(df, "@", **filters)
+            filtered_df = wsec.nearest_sections(df, k=self.k_field.value(), **filters)
             # filters = [float(input_field.text()) if input_field.text().replace(".", "").isnumeric() for input_field in self.input1_fields ]
             # filtered_data = data[data[self.input1_fields[0].text()].isin(filters)]
             self.display_data(filtered_df)
@@ -116,50 +281,101 @@ class MainWindow(QMainWindow):
             except ValueError:
                 pass
 
+        if self.worker is not None:
+            return
         sections_df = self.get_data_from_table()
-        acc = []
-        for df_idx, row in sections_df.iterrows():
-            section = wsec.create_section(row, mesh_size=100)
-            max_vm_stress = wsec.max_vonmises_stress(section, **loads)
-            row['Max VM'] = max_vm_stress
-            acc.append(row)
-        self.display_data(pd.DataFrame(acc))
+        if "Max VM" in sections_df.columns:
+            sections_df = sections_df.drop(columns="Max VM")
+        try:
+            tol = float(self.tol_field.text())
+        except ValueError:
+            tol = None
+        self.worker = VonMisesWorker(sections_df, wsec.normalize_loads(loads), tol)
+        self.display_data(sections_df.assign(**{"Max VM": np.nan}))
+
+        self.worker.signals.result.connect(self.on_von_mises_result)
+        self.worker.signals.finished.connect(self.on_von_mises_finished)
+        self.n_calculated = 0
+        self.n_failed = 0
+        self.calculation_start = time.monotonic()
+        self.progress_bar.setRange(0, len(sections_df))
+        self.progress_bar.setValue(0)
+        self.progress_label.setText(f"0 / {len(sections_df)}")
+        for button in self.busy_buttons:
+            button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.thread_pool.start(self.worker)
+
+    def cancel_von_mises(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.progress_label.setText("Cancelling...")
+
+    def on_von_mises_result(self, position, max_vm_stress, error):
+        self.model.set_value(position, "Max VM", max_vm_stress)
+        self.n_calculated += 1
+        if error:
+            self.n_failed += 1
+        self.progress_bar.setValue(self.n_calculated)
+        n_sections = self.progress_bar.maximum()
+        elapsed = time.monotonic() - self.calculation_start
+        eta = elapsed / self.n_calculated * (n_sections - self.n_calculated)
+        if not self.worker.cancelled:
+            self.progress_label.setText(f"{self.n_calculated} / {n_sections}, ETA {eta:.0f} s")
+
+    def on_von_mises_finished(self, cancelled):
+        self.worker = None
+        for button in self.busy_buttons:
+            button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        n_sections = self.progress_bar.maximum()
+        status = "Cancelled" if cancelled else "Done"
+        failed = f" ({self.n_failed} failed)" if self.n_failed else ""
+        self.progress_label.setText(f"{status}: {self.n_calculated} / {n_sections}{failed}")
+
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+        super().closeEvent(event)
 
     def export_to_excel(self):
-        filename, _ = QFileDialog.getSaveFileName(self, "Export to Excel", "", "Excel Files (*.xlsx)")
-        if filename:
-            data = self.get_data_from_table()
-            data.to_excel(filename, index=False)
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Export",
+            "",
+            "Excel Files (*.xlsx);;CSV Files (*.csv);;Parquet Files (*.parquet)",
+        )
+        if not filename:
+            return
+        if pathlib.Path(filename).suffix.lower() not in exporter.EXPORT_FORMATS:
+            filename += selected_filter[selected_filter.index("*") + 1 : -1]
+        self.export_worker = ExportWorker(self.get_data_from_table(), filename)
+        self.export_worker.signals.finished.connect(self.on_export_finished)
+        for button in self.busy_buttons:
+            button.setEnabled(False)
+        self.progress_label.setText(f"Exporting to {filename}...")
+        self.thread_pool.start(self.export_worker)
+
+    def on_export_finished(self, n_rows, error):
+        for button in self.busy_buttons:
+            button.setEnabled(True)
+        if error:
+            self.progress_label.setText(f"Export failed: {error}")
+        else:
+            self.progress_label.setText(f"Exported {n_rows} rows to {self.export_worker.filename}")
+        self.export_worker = None
 
     def display_data(self, data):
-        self.table.setRowCount(len(data))
-        self.table.setColumnCount(len(data.columns))
-        # Set the column labels
-        self.table.setHorizontalHeaderLabels(data.columns.tolist())
-        for i, row in enumerate(data.values):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(i, j, item)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
+        self.model.set_dataframe(data)
 
     def get_data_from_table(self):
-        columns=self.get_table_header()
-        data = []
-        for i in range(self.table.rowCount()):
-            row = [self.convert_to_float(self.table.item(i, j).text()) for j in range(self.table.columnCount())]
-            data.append(row)
-        df = pd.DataFrame.from_records(data, columns=columns, coerce_float=True)
-        return df
-    
-    def convert_to_float(self, x):
-        try:
-            y = float(x)
-            return y
-        except ValueError:
-            return x
+        # All rows in their original order, whatever the sorting and filter of the view
+        return self.model.dataframe().copy()
 
     def get_table_header(self):
-        return [self.table.horizontalHeaderItem(j).text() for j in range(self.table.columnCount())]
+        return self.model.dataframe().columns.tolist()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
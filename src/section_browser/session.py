@@ -0,0 +1,242 @@
+"""
+Session storage: the current selection and the analysis results computed
+during previous sessions.
+
+The selection is a small JSON document that is replaced atomically. Results
+are appended to a JSON Lines journal, one record per section and load
+combination, so that recording a new result never rewrites earlier ones.
+
+Selections are stored as bitsets over the catalog index: bit i of the
+little-endian 64-bit words is set if the section at index i is selected,
+base64-encoded in the session file. The session file holds the current
+selection, filters and loads, the named snapshots of earlier selections and
+the previous states of the session for undo:
+    {
+        "selection": "...", "filters": {...}, "loads": {...},
+        "snapshots": {"name": {"selection": "...", "filters": {...}}},
+        "history": [{"selection": "...", "filters": {...}, "loads": {...}}]
+    }
+"""
+
+import base64
+import json
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from section_browser import cache as section_cache
+
+# Number of previous states of the session kept for undo
+UNDO_DEPTH = 20
+SELECTION_OPERATIONS = {
+    "union": np.bitwise_or,
+    "intersect": np.bitwise_and,
+    "diff": lambda bits, other_bits: bits & ~other_bits,
+}
+
+
+def write_json_atomic(path: pathlib.Path, json_data: dict) -> None:
+    """
+    Returns None. Writes 'json_data' to 'path' through a temporary file that
+    replaces 'path' so that readers never see a partially written file. The
+    file is left untouched if it already holds 'json_data'.
+    """
+    path = pathlib.Path(path)
+    try:
+        with open(path, "r") as file:
+            if json.load(file) == json_data:
+                return
+    except (OSError, ValueError):
+        pass
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(json_data, file)
+        os.replace(tmp_name, path)
+    except BaseException:
+        pathlib.Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def selection_bits(indexes: list[int]) -> np.ndarray:
+    """
+    Returns the bitset (an array of uint64 words) of the catalog 'indexes'.
+    """
+    indexes = np.asarray(indexes, dtype=np.int64)
+    n_words = int(indexes.max()) // 64 + 1 if len(indexes) else 0
+    flags = np.zeros(n_words * 64, dtype=bool)
+    flags[indexes] = True
+    return np.packbits(flags, bitorder="little").view("<u8")
+
+
+def selection_indexes(bits: np.ndarray) -> list[int]:
+    """
+    Returns the sorted list of the catalog indexes set in the bitset 'bits'.
+    """
+    flags = np.unpackbits(np.asarray(bits, dtype="<u8").view(np.uint8), bitorder="little")
+    return np.flatnonzero(flags).tolist()
+
+
+def combine_selections(bits: np.ndarray, other_bits: np.ndarray, operation: str) -> np.ndarray:
+    """
+    Returns the bitset of 'operation' ("union", "intersect" or "diff", i.e.
+    the sections in 'bits' but not in 'other_bits') applied to the two
+    bitsets, one 64-bit word at a time.
+    """
+    if operation not in SELECTION_OPERATIONS:
+        raise ValueError(f"Unknown selection operation: {operation}")
+    n_words = max(len(bits), len(other_bits))
+    bits = np.pad(np.asarray(bits, dtype="<u8"), (0, n_words - len(bits)))
+    other_bits = np.pad(np.asarray(other_bits, dtype="<u8"), (0, n_words - len(other_bits)))
+    return SELECTION_OPERATIONS[operation](bits, other_bits)
+
+
+def encode_selection(indexes: list[int]) -> str:
+    """
+    Returns the catalog 'indexes' as the base64 text of their bitset.
+    """
+    return base64.b64encode(selection_bits(indexes).tobytes()).decode("ascii")
+
+
+def decode_selection(text: str) -> list[int]:
+    """
+    Returns the sorted list of catalog indexes in the output of
+    encode_selection() 'text'.
+    """
+    return selection_indexes(decode_bits(text))
+
+
+def decode_bits(text: str) -> np.ndarray:
+    """
+    Returns the bitset in the output of encode_selection() 'text'.
+    """
+    return np.frombuffer(base64.b64decode(text), dtype="<u8")
+
+
+def read_session(path: pathlib.Path) -> dict:
+    """
+    Returns the session stored at 'path' (see the module docstring), empty
+    if there is none. A session file that lists the selected "indexes"
+    (written by earlier versions) is converted.
+    """
+    try:
+        with open(path, "r") as file:
+            json_data = json.load(file)
+    except FileNotFoundError:
+        json_data = {}
+    if "indexes" in json_data:
+        json_data["selection"] = encode_selection(json_data.pop("indexes"))
+    json_data.setdefault("selection", encode_selection([]))
+    json_data.setdefault("filters", {})
+    json_data.setdefault("loads", {})
+    json_data.setdefault("snapshots", {})
+    json_data.setdefault("history", [])
+    return json_data
+
+
+def update_session(path: pathlib.Path, indexes: list[int], filters: dict, loads) -> None:
+    """
+    Returns None. Replaces the current selection, filters and loads of the
+    session at 'path', keeping the previous ones (up to UNDO_DEPTH) for undo.
+    """
+    json_data = read_session(path)
+    state = {"selection": encode_selection(indexes), "filters": filters, "loads": loads}
+    previous_state = {key: json_data[key] for key in state}
+    if previous_state != state:
+        json_data["history"] = (json_data["history"] + [previous_state])[-UNDO_DEPTH:]
+    json_data.update(state)
+    write_json_atomic(path, json_data)
+
+
+class ResultsStore:
+    """
+    The maximum von Mises stresses computed for each section (identified by
+    its cache key, i.e. designation, dimensions and mesh size) under each load
+    vector, kept in the JSON Lines journal at 'path'.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self._results = None
+
+    @property
+    def results(self) -> dict:
+        """
+        Returns the dict of result key to maximum von Mises stress, reading
+        the journal on first access.
+        """
+        if self._results is None:
+            self._results = {}
+            try:
+                with open(self.path, "r") as file:
+                    for line in file:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Line truncated by an interrupted write
+                        self._results[record["key"]] = record["sig_vm Max"]
+            except FileNotFoundError:
+                pass
+        return self._results
+
+    def lookup(
+        self, sections_df: pd.DataFrame, load_matrix: np.ndarray, mesh_size: float
+    ) -> np.ndarray:
+        """
+        Returns an array of shape (n_sections, n_combinations) of the stored
+        maximum von Mises stress of each section in 'sections_df' under each
+        row of 'load_matrix' (see w_sections.max_vonmises_stresses()). Results
+        that have not been computed are NaN.
+        """
+        load_matrix = np.atleast_2d(load_matrix)
+        stresses = np.full((len(sections_df), len(load_matrix)), np.nan)
+        for row_idx, (_, row) in enumerate(sections_df.iterrows()):
+            section_key = section_cache.section_key(row, mesh_size)
+            for case_idx, load_vector in enumerate(load_matrix):
+                stress = self.results.get(self._key(section_key, load_vector))
+                if stress is not None:
+                    stresses[row_idx, case_idx] = stress
+        return stresses
+
+    def add(
+        self,
+        steel_section: pd.Series,
+        load_matrix: np.ndarray,
+        mesh_size: float,
+        stresses: np.ndarray,
+    ) -> None:
+        """
+        Returns None. Appends the maximum von Mises 'stresses' of 'steel_section'
+        under each row of 'load_matrix' to the journal.
+        """
+        section_key = section_cache.section_key(steel_section, mesh_size)
+        lines = []
+        for load_vector, stress in zip(np.atleast_2d(load_matrix), stresses):
+            key = self._key(section_key, load_vector)
+            if self.results.get(key) == float(stress):
+                continue
+            self.results[key] = float(stress)
+            record = {
+                "key": key,
+                "Section": steel_section["Section"],
+                "mesh_size": mesh_size,
+                "sig_vm Max": float(stress),
+            }
+            lines.append(json.dumps(record) + "\n")
+        if lines:
+            with open(self.path, "a") as file:
+                file.write("".join(lines))
+
+    def clear(self) -> None:
+        """
+        Returns None. Removes all stored results.
+        """
+        self.path.unlink(missing_ok=True)
+        self._results = {}
+
+    @staticmethod
+    def _key(section_key: str, load_vector: np.ndarray) -> str:
+        return section_key + ":" + ",".join(repr(float(load)) for load in load_vector)
@@ -0,0 +1,136 @@
+"""
+Template meshes of W-sections.
+
+Every W-section has the same topology: two flanges joined by a web with four
+fillets. Instead of running the mesher for each section, a canonical
+I-section (CANONICAL) is meshed once per refinement level and its nodes are
+mapped onto the dimensions of each section by a piecewise-affine morph.
+
+The morph stretches each of the bands between the breakpoints of the
+section (flange tips, fillets, web; bottom flange, fillets, web, top flange)
+independently in x and in y. The fillets are scaled equally in both
+directions so that their arcs stay circular and every boundary node of the
+template lands on the boundary of the target section.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# The dimensions (mm) of the canonical I-section that is meshed, close to
+# the median proportions of the AISC W-sections
+CANONICAL = {"d": 400.0, "bf": 200.0, "tw": 12.0, "tf": 18.0, "kdes": 30.0}
+# Number of points on each fillet, as in w_sections.create_section()
+FILLET_POINTS = 12
+
+# Template meshes built by this process, by refinement level
+_templates: dict[int, dict] = {}
+
+
+def section_area(steel_section) -> float:
+    """
+    Returns the area of the I-section with the d, bf, tw, tf and kdes of
+    'steel_section' (a record from the AISC db or a dict), fillets included.
+    """
+    d, b, t_w, t_f = (
+        steel_section["d"],
+        steel_section["bf"],
+        steel_section["tw"],
+        steel_section["tf"],
+    )
+    r = steel_section["kdes"] - t_f
+    return float(2 * b * t_f + (d - 2 * t_f) * t_w + (4 - np.pi) * r**2)
+
+
+def refinement_level(steel_section, mesh_size: float) -> int:
+    """
+    Returns the refinement level of the template mesh to morph onto
+    'steel_section' for a 'mesh_size' (maximum element area): the power of
+    two nearest to the number of elements of 'mesh_size' that would cover the
+    section. The average element area of the morphed mesh is therefore within
+    a factor of about 1.4 of 'mesh_size'.
+    """
+    return max(0, int(round(np.log2(section_area(steel_section) / mesh_size))))
+
+
+def template_mesh(level: int) -> dict:
+    """
+    Returns the mesh (as stored in Geometry.mesh) of the CANONICAL I-section
+    at the refinement 'level', i.e. with a maximum element area of its area
+    divided by 2 ** 'level'. Each level is only meshed once per process.
+    """
+    if level not in _templates:
+        from sectionproperties.pre.library import steel_sections as steel
+
+        geom = steel.i_section(
+            d=CANONICAL["d"],
+            b=CANONICAL["bf"],
+            t_f=CANONICAL["tf"],
+            t_w=CANONICAL["tw"],
+            r=CANONICAL["kdes"] - CANONICAL["tf"],
+            n_r=FILLET_POINTS,
+        )
+        geom.create_mesh(section_area(CANONICAL) / 2**level)
+        _templates[level] = geom.mesh
+    return _templates[level]
+
+
+def breakpoints(steel_section) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple of the x and y coordinates that divide the I-section with
+    the dimensions of 'steel_section' into the bands that are morphed
+    independently. The origin is at the bottom left corner, as in
+    sectionproperties' i_section().
+    """
+    d, b, t_w, t_f = (
+        steel_section["d"],
+        steel_section["bf"],
+        steel_section["tw"],
+        steel_section["tf"],
+    )
+    r = steel_section["kdes"] - t_f
+    x = np.array([0, b / 2 - t_w / 2 - r, b / 2 - t_w / 2, b / 2 + t_w / 2, b / 2 + t_w / 2 + r, b])
+    y = np.array([0, t_f, t_f + r, d - t_f - r, d - t_f, d])
+    return x, y
+
+
+def morph_mesh(mesh: dict, steel_section, source: Optional[dict] = None) -> dict:
+    """
+    Returns a copy of the I-section 'mesh' (as stored in Geometry.mesh) of
+    the section with the dimensions 'source' (CANONICAL by default) with its
+    nodes moved onto the section with the dimensions of 'steel_section'.
+
+    The corner nodes are mapped piecewise-affinely between the breakpoints()
+    of the two sections and the mid-side nodes of the quadratic elements are
+    placed at the middle of their mapped edges so that every edge stays
+    straight.
+    """
+    source = CANONICAL if source is None else source
+    source_x, source_y = breakpoints(source)
+    target_x, target_y = breakpoints(steel_section)
+    vertices = np.asarray(mesh["vertices"], dtype=float)
+    triangles = np.asarray(mesh["triangles"], dtype=int)
+    morphed = np.column_stack(
+        [
+            np.interp(vertices[:, 0], source_x, target_x),
+            np.interp(vertices[:, 1], source_y, target_y),
+        ]
+    )
+    # The mesher numbers the mid-side nodes 3, 4, 5 opposite corners 0, 1, 2
+    for mid_node, (start, end) in zip([3, 4, 5], [(1, 2), (2, 0), (0, 1)]):
+        morphed[triangles[:, mid_node]] = 0.5 * (
+            morphed[triangles[:, start]] + morphed[triangles[:, end]]
+        )
+    morphed_mesh = dict(mesh)
+    morphed_mesh["vertices"] = morphed
+    return morphed_mesh
+
+
+def morphed_mesh(steel_section: pd.Series, mesh_size: float) -> dict:
+    """
+    Returns a mesh of the I-section described by 'steel_section' for a
+    'mesh_size' (maximum element area) morphed from the template mesh at its
+    refinement_level(), without running the mesher.
+    """
+    return morph_mesh(template_mesh(refinement_level(steel_section, mesh_size)), steel_section)
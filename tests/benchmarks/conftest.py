@@ -0,0 +1,76 @@
+import json
+import pathlib
+import platform
+import time
+import pytest
+
+BENCHMARK_RESULTS: dict = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark")
+    benchmarks_dir = pathlib.Path(__file__).parent
+    for item in items:
+        if benchmarks_dir in pathlib.Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    save_path = session.config.getoption("--benchmark-save")
+    if save_path is None or not BENCHMARK_RESULTS:
+        return
+    json_data = {
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "benchmarks": BENCHMARK_RESULTS,
+    }
+    with open(save_path, "w") as file:
+        json.dump(json_data, file, indent=2)
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(pytestconfig) -> dict:
+    compare_path = pytestconfig.getoption("--benchmark-compare")
+    if compare_path is None:
+        return {}
+    with open(compare_path, "r") as file:
+        return json.load(file)["benchmarks"]
+
+
+@pytest.fixture
+def bench(request, benchmark_baseline):
+    """
+    Returns a function that times calls to 'func' and records the timings
+    under the name of the current test. The fastest of 'rounds' calls is
+    compared against the baseline, if any.
+
+    'setup' is called before each round (untimed) and its return value is
+    passed to 'func', for benchmarks that consume their input.
+    """
+    threshold = request.config.getoption("--benchmark-threshold")
+
+    def run(func, rounds: int = 5, setup=None):
+        timings = []
+        result = None
+        for _ in range(rounds):
+            args = () if setup is None else (setup(),)
+            start = time.perf_counter()
+            result = func(*args)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        BENCHMARK_RESULTS[request.node.name] = {
+            "min": timings[0],
+            "median": timings[len(timings) // 2],
+            "rounds": rounds,
+        }
+        baseline = benchmark_baseline.get(request.node.name)
+        if baseline is not None and timings[0] > baseline["min"] * (1 + threshold):
+            pytest.fail(
+                f"{request.node.name} slowed down: {timings[0]:.4g} s "
+                f"vs. baseline {baseline['min']:.4g} s (threshold {threshold:.0%})"
+            )
+        return result
+
+    return run
@@ -0,0 +1,118 @@
+import contextlib
+import io
+import numpy as np
+import pytest
+from rich.console import Console
+import section_browser.w_sections as wsec
+from section_browser import integration, main
+
+MESH_SIZES = [500, 100, 20]
+SECTION = "W310X97"
+QUERIES = {
+    "range_and_threshold": {"d": "300..600", "Zx": ">1200"},
+    "approx_and_or": {"d": "@500", "bf": "<200|>300", "Ix": ">=400"},
+    "many_fields": {"W": "<=150", "A": ">5000", "Sx": ">500", "Iy": "!=0", "tw": "<20"},
+}
+
+
+@pytest.fixture(scope="module")
+def aisc_df():
+    return wsec.load_aisc_w_sections()
+
+
+@pytest.fixture(scope="module")
+def steel_section(aisc_df):
+    return aisc_df.loc[aisc_df["Section"] == SECTION].iloc[0]
+
+
+def test_load_aisc_w_sections(bench):
+    bench(wsec.load_aisc_w_sections, rounds=20)
+
+
+@pytest.mark.parametrize("query", QUERIES.keys())
+def test_apply_all_filters(bench, aisc_df, query):
+    bench(lambda: main._apply_all_filters(aisc_df, QUERIES[query]), rounds=20)
+
+
+@pytest.mark.parametrize("mesh_size", MESH_SIZES)
+def test_create_section(bench, steel_section, mesh_size):
+    bench(lambda: wsec.create_section(steel_section, mesh_size), rounds=3)
+
+
+@pytest.mark.parametrize("mesh_size", MESH_SIZES)
+def test_calculate_geometric_properties(bench, steel_section, mesh_size):
+    bench(
+        lambda section: section.calculate_geometric_properties(),
+        rounds=3,
+        setup=lambda: _quiet_section(steel_section, mesh_size),
+    )
+
+
+@pytest.mark.parametrize("mesh_size", MESH_SIZES)
+def test_calculate_warping_properties(bench, steel_section, mesh_size):
+    def setup():
+        section = _quiet_section(steel_section, mesh_size)
+        section.calculate_geometric_properties()
+        return section
+
+    bench(lambda section: section.calculate_warping_properties(), rounds=3, setup=setup)
+
+
+@pytest.mark.parametrize("mesh_size", MESH_SIZES)
+def test_calculate_warping_properties_reused_shape_functions(bench, steel_section, mesh_size):
+    def setup():
+        section = _quiet_section(steel_section, mesh_size)
+        section.calculate_geometric_properties()
+        return section
+
+    def warping(section):
+        with integration.reused_shape_functions():
+            section.calculate_warping_properties()
+
+    bench(warping, rounds=3, setup=setup)
+
+
+@pytest.mark.parametrize("reuse", [False, True])
+def test_analyze_batch(bench, aisc_df, reuse, monkeypatch):
+    # Adjacent sizes of one series, as in a batch run over a catalog range
+    sections_df = aisc_df.loc[aisc_df["Section"].str.startswith("W610")].head(8)
+    if not reuse:
+        monkeypatch.setattr(integration, "reused_shape_functions", contextlib.nullcontext)
+    bench(
+        lambda: [wsec.analyze_section(row, mesh_size=100) for _, row in sections_df.iterrows()],
+        rounds=1,
+    )
+
+
+@pytest.mark.parametrize("mesh_size", MESH_SIZES)
+def test_max_vonmises_stress(bench, steel_section, mesh_size):
+    section = wsec.analyze_section(steel_section, mesh_size)
+    section.time_info = False
+    loads = {"N": 50e3, "Mx": 200e6, "My": 20e6, "Vx": 10e3, "Vy": 300e3, "Mz": 5e6}
+    bench(lambda: wsec.max_vonmises_stress(section, **loads), rounds=3)
+
+
+@pytest.mark.parametrize("critical_points", [False, True])
+@pytest.mark.parametrize("mesh_size", MESH_SIZES)
+def test_max_vonmises_stresses_1000_cases(bench, steel_section, mesh_size, critical_points):
+    section = wsec.analyze_section(steel_section, mesh_size)
+    section.time_info = False
+    basis = wsec.unit_stress_basis(section)
+    if critical_points:
+        basis = basis[:, :, wsec.critical_nodes(basis)]
+    load_matrix = np.random.default_rng(0).normal(size=(1000, 6)) * [50e3, 10e3, 300e3, 200e6, 20e6, 5e6]
+    bench(lambda: wsec.max_vonmises_stresses(basis, load_matrix), rounds=5)
+
+
+def test_create_table_full_catalog(bench, aisc_df):
+    def render():
+        console = Console(file=io.StringIO(), width=200)
+        console.print(main._create_table(aisc_df))
+
+    bench(render, rounds=5)
+
+
+def _quiet_section(steel_section, mesh_size):
+    section = wsec.create_section(steel_section, mesh_size)
+    section.time_info = False
+    return section
@@ -0,0 +1,54 @@
+import pytest
+from section_browser import cache
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks in tests/benchmarks and the tests marked 'benchmark' (skipped by default)",
+    )
+    group.addoption(
+        "--benchmark-save",
+        metavar="PATH",
+        default=None,
+        help="Save the benchmark timings as a JSON baseline at PATH",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        metavar="PATH",
+        default=None,
+        help="Fail benchmarks that are slower than the JSON baseline at PATH",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown relative to the baseline, as a fraction (default 0.25)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: slow or timing dependent test, only run with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="only runs with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """
+    Points the section cache (and the compiled catalog within it) at a
+    temporary directory so that tests never write to the user's cache.
+    """
+    monkeypatch.setenv(cache.CACHE_DIR_ENV, str(tmp_path_factory.mktemp("cache")))
@@ -1,6 +1,10 @@
 import pathlib
 import json
-from section_browser import main
+import pandas as pd
+import pytest
+import typer
+from section_browser import main, session
+import section_browser.w_sections as wsec
 
 TEST_DATA_STORE_FILE = pathlib.Path(__file__).parents[0] / "TEST_DATA_STORE.json"
 
@@ -17,7 +21,13 @@ def test_clear_data_store():
     main._clear_data_store(TEST_DATA_STORE_FILE)
     with open(TEST_DATA_STORE_FILE, "r") as test_file:
         test_data = json.load(test_file)
-    assert test_data == {"indexes": [], "filters": {}, "loads": {}}
+    assert test_data == {
+        "selection": "",
+        "filters": {},
+        "loads": {},
+        "snapshots": {},
+        "history": [],
+    }
 
 
 def test_set_current_indexes():
@@ -26,11 +36,10 @@ def test_set_current_indexes():
     )
     with open(TEST_DATA_STORE_FILE, "r") as test_file:
         test_data = json.load(test_file)
-    assert test_data == {
-        "indexes": [1, 2, 3],
-        "filters": {"B": "cat"},
-        "loads": {"C": "scarf"},
-    }
+    assert session.decode_selection(test_data["selection"]) == [1, 2, 3]
+    assert test_data["filters"] == {"B": "cat"}
+    assert test_data["loads"] == {"C": "scarf"}
+    assert test_data["history"] == [{"selection": "", "filters": {}, "loads": {}}]
 
 
 def test_get_current_indexes():
@@ -58,3 +67,91 @@ def test_parse_comparison_value():
     assert main._parse_comparison_value(cv1) == (">", 93.0)
     assert main._parse_comparison_value(cv2) == ("~=", 34.5)
     assert main._parse_comparison_value(cv3) == ("@", 43.5e6)
+
+
+def test_read_load_cases(tmp_path):
+    load_cases_file = tmp_path / "load_cases.csv"
+    load_cases_file.write_text("case,N,Mx,T\nD,1000,,\nD+L,1500,2e6,3e5\n")
+    assert main._read_load_cases(load_cases_file) == [
+        {"case": "D", "N": 1000.0},
+        {"case": "D+L", "N": 1500.0, "Mx": 2e6, "T": 3e5},
+    ]
+
+
+def test_parse_filter_expression():
+    assert main._parse_filter_expression(">=300") == [(">=", 300.0)]
+    assert main._parse_filter_expression("!=300") == [("!=", 300.0)]
+    assert main._parse_filter_expression("300") == [("==", 300.0)]
+    assert main._parse_filter_expression("300..600") == [("..", (300.0, 600.0))]
+    assert main._parse_filter_expression("<200|@450") == [("<", 200.0), ("@", 450.0)]
+
+
+def test_apply_all_filters():
+    test_df = pd.DataFrame(
+        data=[["A", 200, 300], ["B", 250, 250], ["C", 400, 600], ["D", 500, 700]],
+        columns=["Section", "d", "Ix"],
+    )
+    selection = main._apply_all_filters(test_df, {"d": ">250"})
+    assert list(selection["Section"]) == ["C", "D"]
+    selection = main._apply_all_filters(test_df, {"d": "<=250", "Ix": "!=300"})
+    assert list(selection["Section"]) == ["B"]
+    selection = main._apply_all_filters(test_df, {"d": "<210|450..500"})
+    assert list(selection["Section"]) == ["A", "D"]
+    selection = main._apply_all_filters(test_df, {"Ix": "@640"}, k=2)
+    assert list(selection["Section"]) == ["C", "D"]
+    selection = main._apply_all_filters(test_df, {"Ix": "@640", "d": "<450"})
+    assert list(selection["Section"]) == ["C", "A", "B"]
+
+
+def test_add_stored_results(tmp_path):
+    results_file = tmp_path / "RESULTS_STORE.jsonl"
+    aisc_df = wsec.load_aisc_w_sections()
+    current_selection = aisc_df.iloc[:3]
+    load_matrix = wsec.load_case_matrix(pd.DataFrame([{"Mx": 1e6}]))
+    assert "sig_vm Max" not in main._add_stored_results(
+        current_selection, {"Mx": 1e6}, results_file
+    )
+    session.ResultsStore(results_file).add(
+        current_selection.iloc[1], load_matrix, 100, [35.0]
+    )
+    with_results = main._add_stored_results(current_selection, {"Mx": 1e6}, results_file)
+    assert with_results["sig_vm Max"].isna().tolist() == [True, False, True]
+    assert with_results["DCR stress"].iloc[1] == 0.1
+
+
+def test_combine_with_snapshots(tmp_path):
+    session_file = tmp_path / "DATA_STORE.json"
+    main._set_current_indexes([1, 2, 3], {}, {}, session_file)
+    json_data = session.read_session(session_file)
+    json_data["snapshots"]["a"] = {"selection": session.encode_selection([3, 4]), "filters": {}}
+    session.write_json_atomic(session_file, json_data)
+    main._combine_with_snapshots(["a"], "union", session_file)
+    assert main._get_current_indexes(session_file)[0] == [1, 2, 3, 4]
+    main._combine_with_snapshots(["a"], "diff", session_file)
+    indexes, filters, _ = main._get_current_indexes(session_file)
+    assert indexes == [1, 2]
+    assert filters == {"selection": "union a, diff a"}
+
+
+def test_create_table():
+    df = wsec.load_aisc_w_sections().iloc[:5]
+    table = main._create_table(df, n_cols=3, n_rows=2)
+    assert [column.header for column in table.columns] == ["index", "Section", "W", "A", "..."]
+    assert table.row_count == 3
+    assert list(table.columns[1].cells) == [df["Section"].iloc[0], df["Section"].iloc[1], "..."]
+    assert main._create_table(df).row_count == 5
+
+
+def test_page_bounds():
+    assert main._page_bounds(120, 1, 50) == (0, 50)
+    assert main._page_bounds(120, 3, 50) == (100, 120)
+    assert main._page_bounds(0, 1, 50) == (0, 0)
+    with pytest.raises(typer.BadParameter):
+        main._page_bounds(120, 4, 50)
+
+
+def test_calculate_max_vm_removes_profile_hook(tmp_path):
+    with pytest.raises(typer.BadParameter):
+        main.calculate_max_vm(":", profile=tmp_path / "profile.csv", page=1000)
+    assert not main.profiling.enabled()
+    assert not main.profiling.tracking_memory()
@@ -0,0 +1,62 @@
+import json
+import pandas as pd
+import pytest
+from section_browser import batch, main
+import section_browser.w_sections as wsec
+
+
+def write_job(tmp_path, **job):
+    job_path = tmp_path / "job.json"
+    with open(job_path, "w") as file:
+        json.dump(job, file)
+    return job_path
+
+
+def test_read_job(tmp_path):
+    pd.DataFrame([{"case": "D", "Mx": 1e6}, {"T": 2e5}]).to_csv(tmp_path / "loads.csv", index=False)
+    job = batch.read_job(write_job(tmp_path, filters=[{"d": "<110"}], load_table="loads.csv"))
+    assert job["load_cases"] == [{"case": "D", "Mx": 1e6}, {"T": 2e5}]
+    assert (job["fy"], job["mesh_size"]) == (batch.DEFAULT_FY, batch.DEFAULT_MESH_SIZE)
+    assert batch.job_load_cases(job)["case"].tolist() == ["D", 1]
+    with pytest.raises(ValueError):
+        batch.read_job(write_job(tmp_path, sections=["W310X97"], load_cases=[{"Q": 1.0}]))
+    with pytest.raises(ValueError):
+        batch.read_job(write_job(tmp_path, load_cases=[{"Mx": 1.0}]))
+
+
+def test_run_job_resume(tmp_path):
+    aisc_df = wsec.load_aisc_w_sections()
+    section_names = aisc_df["Section"].iloc[-2:].tolist()
+    job = batch.read_job(
+        write_job(
+            tmp_path,
+            sections=section_names,
+            load_cases=[{"case": "D", "Mx": 1e6}, {"case": "D+W", "Mx": 1e6, "Vy": 10e3}],
+            mesh_size=500,
+        )
+    )
+    output_path = tmp_path / "results.csv"
+    run_kwargs = {"apply_filters": main._apply_all_filters, "use_cache": False}
+
+    # Interrupted after the first section, leaving a partially written row
+    results = batch.run_job(job, aisc_df, output_path, **run_kwargs)
+    first_name, error, n_remaining = next(results)
+    results.close()
+    assert (error, n_remaining) == ("", 1)
+    with open(output_path, "a") as file:
+        file.write(f"{section_names[1]},D,0.0")
+
+    resumed = list(batch.run_job(job, aisc_df, output_path, **run_kwargs))
+    assert [name for name, _, _ in resumed] == [name for name in section_names if name != first_name]
+    results_df = pd.read_csv(output_path, keep_default_na=False)
+    assert results_df.columns.tolist() == batch.RESULT_COLUMNS
+    assert sorted(results_df["Section"].unique()) == sorted(section_names)
+    assert results_df["case"].tolist() == ["D", "D+W", "D", "D+W"]
+    assert results_df["DCR stress"].to_numpy() == pytest.approx(results_df["sig_vm Max"].to_numpy() / 350)
+    assert list(batch.run_job(job, aisc_df, output_path, **run_kwargs)) == []
+
+    job["fy"] = 300
+    with pytest.raises(ValueError):
+        list(batch.run_job(job, aisc_df, output_path, **run_kwargs))
+    restarted = list(batch.run_job(job, aisc_df, output_path, restart=True, **run_kwargs))
+    assert len(restarted) == 2
@@ -0,0 +1,68 @@
+import time
+import section_browser.w_sections as wsec
+from section_browser import cache
+
+
+def test_section_key():
+    aisc_df = wsec.load_aisc_w_sections()
+    row = aisc_df.iloc[0]
+    assert cache.section_key(row, 100) == cache.section_key(row.copy(), 100.0)
+    assert cache.section_key(row, 100) != cache.section_key(row, 50)
+    assert cache.section_key(row, 100) != cache.section_key(aisc_df.iloc[1], 100)
+    assert cache.section_key(row, 100) != cache.section_key(row, 100, kind="other")
+
+
+def test_section_cache_lru_eviction(tmp_path):
+    section_cache = cache.SectionCache(tmp_path, max_bytes=2500)
+    section_cache.put("a", b"0" * 1000)
+    time.sleep(0.01)
+    section_cache.put("b", b"1" * 1000)
+    time.sleep(0.01)
+    assert section_cache.get("a") == b"0" * 1000  # "a" is now most recently used
+    time.sleep(0.01)
+    section_cache.put("c", b"2" * 1000)
+    assert "a" in section_cache
+    assert "b" not in section_cache
+    assert "c" in section_cache
+    assert section_cache.get("b") is None
+    section_cache.clear()
+    assert section_cache.size_bytes() == 0
+
+
+def test_section_cache_get_evicted_concurrently(tmp_path, monkeypatch):
+    section_cache = cache.SectionCache(tmp_path)
+    section_cache.put("a", b"0")
+    monkeypatch.setattr(cache, "_memory", type(cache._memory)())
+
+    def evicted(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(cache.os, "utime", evicted)
+    assert section_cache.get("a") == b"0"
+
+
+def test_analyze_section_cached(tmp_path):
+    section_cache = cache.SectionCache(tmp_path)
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    section = wsec.analyze_section(row, mesh_size=500, cache=section_cache)
+    cached_section = wsec.analyze_section(row, mesh_size=500, cache=section_cache)
+    assert cached_section is not section
+    assert cached_section.section_props.j == section.section_props.j
+    assert wsec.max_vonmises_stress(
+        cached_section, Mx=10e6
+    ) == wsec.max_vonmises_stress(section, Mx=10e6)
+
+
+def test_keep_in_memory(tmp_path):
+    section_cache = cache.SectionCache(tmp_path)
+    cache.keep_in_memory(2)
+    try:
+        for key in ["a", "b", "c"]:
+            section_cache.put(key, [key])
+        assert list(cache._memory) == [tmp_path / "b.pkl", tmp_path / "c.pkl"]
+        assert section_cache.get("c") is section_cache.get("c")
+        assert section_cache.get("a") == ["a"]  # Read from disk
+        section_cache.clear()
+        assert section_cache.get("a") is None
+    finally:
+        cache.keep_in_memory(0)
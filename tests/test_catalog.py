@@ -0,0 +1,22 @@
+import pandas as pd
+from section_browser import catalog
+import section_browser.w_sections as wsec
+
+
+def test_load_catalog(tmp_path):
+    csv_df = pd.read_csv(wsec.AISC_W_SECTIONS_FILE)
+    catalog_df = catalog.load_catalog(wsec.AISC_W_SECTIONS_FILE, tmp_path)
+    pd.testing.assert_frame_equal(catalog_df, csv_df)
+    columns = catalog.load_catalog_columns(wsec.AISC_W_SECTIONS_FILE, tmp_path)
+    assert list(columns) == list(csv_df.columns)
+    assert columns["Section"][0] == "W1100X499"
+    assert columns["d"][0] == 1120
+
+
+def test_load_catalog_rebuilds_on_change(tmp_path):
+    csv_file = tmp_path / "catalog.csv"
+    csv_file.write_text("Section,d\nW1,100\n")
+    assert catalog.load_catalog(csv_file, tmp_path / "cache")["d"].tolist() == [100]
+    csv_file.write_text("Section,d\nW1,200\n")
+    assert catalog.load_catalog(csv_file, tmp_path / "cache")["d"].tolist() == [200]
+    assert len(list((tmp_path / "cache").iterdir())) == 2
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import time
+from section_browser import daemon
+
+
+def test_forward_without_daemon(tmp_path):
+    assert not daemon.is_running(tmp_path / "missing.sock")
+    assert daemon.forward(["status"], tmp_path / "missing.sock") is None
+    assert not daemon.stop(tmp_path / "missing.sock")
+
+
+def test_forward_to_daemon(tmp_path, capsys):
+    socket_path = tmp_path / "daemon.sock"
+    code = (
+        "from section_browser import daemon, main; "
+        f"daemon.serve(main.app, {str(socket_path)!r})"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code])
+    try:
+        for _ in range(300):
+            if daemon.is_running(socket_path):
+                break
+            time.sleep(0.1)
+        assert daemon.forward(["status"], socket_path) == 0
+        assert "Current selection" in capsys.readouterr().out
+        assert daemon.forward(["nonexistent-command"], socket_path) == 2
+        assert "No such command" in capsys.readouterr().out
+        assert daemon.forward(["daemon", "status"], socket_path) is None
+        assert daemon.stop(socket_path)
+        assert process.wait(timeout=30) == 0
+        assert not socket_path.exists()
+    finally:
+        process.kill()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+import section_browser.w_sections as wsec
+from section_browser import exporter
+
+
+def test_export_dataframe(tmp_path):
+    df = wsec.load_aisc_w_sections().iloc[:7].reset_index(drop=True)
+    df["sig_vm Max"] = [1.5, np.nan, 2.0, 3.0, 4.0, 5.0, 6.0]
+    for suffix in [".csv", ".xlsx"]:
+        path = tmp_path / f"results{suffix}"
+        assert exporter.export_dataframe(df, path, chunk_rows=3) == 7
+        read_df = pd.read_csv(path) if suffix == ".csv" else pd.read_excel(path)
+        assert read_df["Section"].tolist() == df["Section"].tolist()
+        assert np.allclose(read_df["Ix"], df["Ix"])
+        assert read_df["sig_vm Max"].isna().tolist() == df["sig_vm Max"].isna().tolist()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["results.csv", "results.xlsx"]
+    with pytest.raises(ValueError):
+        exporter.export_format(tmp_path / "results.txt")
+
+
+def test_export_parquet_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    df = wsec.load_aisc_w_sections().iloc[:7]
+    path = tmp_path / "results.parquet"
+    exporter.export_dataframe(df, path, chunk_rows=3)
+    assert pq.ParquetFile(path).num_row_groups == 3
+    assert pd.read_parquet(path)["Section"].tolist() == df["Section"].tolist()
+
+
+def test_aborted_export(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("previous")
+    df = wsec.load_aisc_w_sections().iloc[:4]
+    chunks = [df.iloc[:2], df.iloc[2:, :3]]
+    with pytest.raises(ValueError):
+        exporter.export_chunks(chunks, path)
+    assert path.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_chunks():
+    df = wsec.load_aisc_w_sections().iloc[:5]
+    rows = (row for _, row in df.iterrows())
+    assert [len(chunk) for chunk in exporter.row_chunks(rows, 2)] == [2, 2, 1]
+    frames = [df.iloc[:1], df.iloc[1:2], df.iloc[2:5]]
+    assert [len(chunk) for chunk in exporter.frame_chunks(frames, 2)] == [2, 3]
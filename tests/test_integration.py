@@ -0,0 +1,69 @@
+import threading
+import numpy as np
+import section_browser.w_sections as wsec
+from section_browser import integration
+
+
+def test_batched_shape_functions():
+    from sectionproperties.analysis import fea
+
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    section = wsec.create_section(row, mesh_size=500)
+    gauss_points = fea.gauss_points(6)
+    for element in section.elements[:5]:
+        N, B, j = integration.batched_shape_functions(element.coords, gauss_points)
+        for idx, gauss_point in enumerate(gauss_points):
+            N_ref, B_ref, j_ref = fea.shape_function(element.coords, gauss_point)
+            assert np.allclose(N[idx], N_ref)
+            assert np.allclose(B[idx], B_ref, rtol=1e-12, atol=0)
+            assert np.isclose(j[idx], j_ref, rtol=1e-12)
+
+
+def test_reused_shape_functions():
+    from sectionproperties.analysis import fea
+
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    original = fea.shape_function
+    reference = wsec.create_section(row, mesh_size=500)
+    reference.calculate_geometric_properties()
+    reference.calculate_warping_properties()
+    section = wsec.analyze_section(row, mesh_size=500)
+    assert fea.shape_function is original
+    assert np.isclose(section.section_props.j, reference.section_props.j, rtol=1e-12)
+    assert np.isclose(section.section_props.gamma, reference.section_props.gamma, rtol=1e-12)
+    assert np.allclose(
+        wsec.unit_stress_basis(section), wsec.unit_stress_basis(reference), rtol=1e-9, atol=1e-15
+    )
+
+
+def test_reused_shape_functions_threads():
+    from sectionproperties.analysis import fea
+
+    original = fea.shape_function
+    coords = np.array([[0.0, 2.0, 0.0, 1.0, 1.0, 0.0], [0.0, 0.0, 2.0, 0.0, 1.0, 1.0]])
+    gauss_point = np.asarray(fea.gauss_points(6), dtype=float)[0]
+    expected = original(coords, gauss_point)
+    inner_entered = threading.Event()
+    outer_exited = threading.Event()
+    results = []
+
+    def inner():
+        with integration.reused_shape_functions():
+            inner_entered.set()
+            outer_exited.wait(timeout=10)
+            # The other thread's exit must not restore the original or drop the cache
+            assert fea.shape_function is not original
+            results.append(fea.shape_function(coords, gauss_point))
+
+    thread = threading.Thread(target=inner)
+    with integration.reused_shape_functions():
+        thread.start()
+        inner_entered.wait(timeout=10)
+        shape_function = fea.shape_function
+    outer_exited.set()
+    thread.join()
+    assert fea.shape_function is original
+    assert len(results) == 1
+    assert np.allclose(results[0][1], expected[1])
+    # A reference looked up within the context manager still works after it exits
+    assert np.allclose(shape_function(coords, gauss_point)[1], expected[1])
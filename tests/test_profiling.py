@@ -0,0 +1,56 @@
+import json
+import pandas as pd
+import section_browser.w_sections as wsec
+from section_browser import profiling
+
+
+def test_stage_without_hooks():
+    assert not profiling.enabled()
+    with profiling.stage("mesh", "W1", 100) as record:
+        pass
+    assert record == {}
+
+
+def test_stage_recorder(tmp_path):
+    recorder = profiling.StageRecorder()
+    profiling.add_hook(recorder, track_memory=True)
+    try:
+        with profiling.stage("mesh", "W1", 100) as record:
+            record["elements"] = 10
+            data = [0] * 10000
+    finally:
+        profiling.remove_hook(recorder)
+    assert not profiling.enabled() and not profiling.tracking_memory()
+    (record,) = recorder.records
+    assert record["stage"] == "mesh" and record["elements"] == 10
+    assert record["seconds"] > 0 and record["peak_memory"] > 0
+    recorder.export(tmp_path / "profile.json")
+    recorder.export(tmp_path / "profile.csv")
+    with open(tmp_path / "profile.json", "r") as file:
+        assert json.load(file) == recorder.records
+    assert pd.read_csv(tmp_path / "profile.csv")["stage"].tolist() == ["mesh"]
+
+
+def test_calculate_section_stresses_profiled():
+    sections_df = wsec.load_aisc_w_sections().iloc[-2:]
+    for workers in [None, 2]:
+        recorder = profiling.StageRecorder()
+        profiling.add_hook(recorder)
+        try:
+            wsec.calculate_section_stresses(
+                sections_df, 350, Mx=1e6, mesh_size=500, use_cache=False, workers=workers
+            )
+        finally:
+            profiling.remove_hook(recorder)
+        summary = recorder.summary()
+        assert len(summary) == 2
+        assert list(summary.columns) == [
+            "geometry",
+            "mesh",
+            "geometric_properties",
+            "warping",
+            "stress",
+            "von_mises",
+            "total",
+        ]
+        assert recorder.to_dataframe()["elements"].notna().sum() == 8
@@ -0,0 +1,79 @@
+import json
+import numpy as np
+import section_browser.w_sections as wsec
+from section_browser import session
+
+
+def test_write_json_atomic(tmp_path):
+    json_file = tmp_path / "store.json"
+    session.write_json_atomic(json_file, {"indexes": [1, 2]})
+    with open(json_file, "r") as file:
+        assert json.load(file) == {"indexes": [1, 2]}
+    mtime = json_file.stat().st_mtime_ns
+    session.write_json_atomic(json_file, {"indexes": [1, 2]})
+    assert json_file.stat().st_mtime_ns == mtime
+    assert list(tmp_path.iterdir()) == [json_file]
+
+
+def test_results_store(tmp_path):
+    results_file = tmp_path / "results.jsonl"
+    sections_df = wsec.load_aisc_w_sections().iloc[:2]
+    load_matrix = np.array([[0, 0, 0, 1e6, 0, 0], [0, 0, 0, 2e6, 0, 0]])
+    store = session.ResultsStore(results_file)
+    assert np.isnan(store.lookup(sections_df, load_matrix, 100)).all()
+    store.add(sections_df.iloc[0], load_matrix, 100, [1.0, 2.0])
+    store.add(sections_df.iloc[0], load_matrix, 100, [1.0, 2.0])
+    with open(results_file, "a") as file:
+        file.write('{"key": "trunc')  # Interrupted write
+    stored = session.ResultsStore(results_file).lookup(sections_df, load_matrix, 100)
+    assert stored[0].tolist() == [1.0, 2.0]
+    assert np.isnan(stored[1]).all()
+    assert np.isnan(store.lookup(sections_df, load_matrix, 50)).all()
+    assert len(results_file.read_text().splitlines()) == 3
+
+
+def test_calculate_section_stresses_stored(tmp_path):
+    store = session.ResultsStore(tmp_path / "results.jsonl")
+    sections_df = wsec.load_aisc_w_sections().iloc[-1:]
+    analyzed_df = wsec.calculate_section_stresses(
+        sections_df, 350, Mx=1e6, mesh_size=500, use_cache=False, results_store=store
+    )
+    stored = store.lookup(sections_df, [[0, 0, 0, 1e6, 0, 0]], 500)
+    assert stored[0, 0] == analyzed_df["sig_vm Max"].iloc[0]
+    store.add(sections_df.iloc[0], [[0, 0, 0, 1e6, 0, 0]], 500, [123.0])
+    analyzed_df = wsec.calculate_section_stresses(
+        sections_df, 350, Mx=1e6, mesh_size=500, use_cache=False, results_store=store
+    )
+    assert analyzed_df["sig_vm Max"].iloc[0] == 123.0
+
+
+def test_selection_bits():
+    indexes = [0, 3, 63, 64, 282]
+    bits = session.selection_bits(indexes)
+    assert bits.dtype == np.dtype("<u8") and len(bits) == 5
+    assert session.selection_indexes(bits) == indexes
+    assert session.decode_selection(session.encode_selection(indexes)) == indexes
+    assert session.decode_selection(session.encode_selection([])) == []
+
+    other_bits = session.selection_bits([3, 64, 100])
+    combine = lambda operation: session.selection_indexes(
+        session.combine_selections(bits, other_bits, operation)
+    )
+    assert combine("union") == [0, 3, 63, 64, 100, 282]
+    assert combine("intersect") == [3, 64]
+    assert combine("diff") == [0, 63, 282]
+
+
+def test_update_session(tmp_path):
+    session_file = tmp_path / "DATA_STORE.json"
+    session.write_json_atomic(session_file, {"indexes": [1, 2], "filters": {}, "loads": {}})
+    assert session.decode_selection(session.read_session(session_file)["selection"]) == [1, 2]
+    for step in range(session.UNDO_DEPTH + 5):
+        session.update_session(session_file, [step], {"d": f"<{step}"}, {})
+    json_data = session.read_session(session_file)
+    assert session.decode_selection(json_data["selection"]) == [session.UNDO_DEPTH + 4]
+    assert len(json_data["history"]) == session.UNDO_DEPTH
+    assert json_data["history"][-1]["filters"] == {"d": f"<{session.UNDO_DEPTH + 3}"}
+    # An unchanged state is not added to the history
+    session.update_session(session_file, [session.UNDO_DEPTH + 4], json_data["filters"], {})
+    assert session.read_session(session_file)["history"] == json_data["history"]
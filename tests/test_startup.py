@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+
+# Wall time budget (seconds) for 'sectionbrowser status'. Override with the
+# SECTION_BROWSER_STARTUP_BUDGET environment variable on slow machines. The
+# timing only runs with --benchmark since it depends on the machine's load;
+# test_cli_does_not_import_analysis_stack() checks the lazy imports always.
+STARTUP_BUDGET = float(os.environ.get("SECTION_BROWSER_STARTUP_BUDGET", 1.25))
+HEAVY_MODULES = ["sectionproperties", "scipy", "matplotlib"]
+
+
+def test_cli_does_not_import_analysis_stack():
+    code = (
+        "import sys; import section_browser.main; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.benchmark
+def test_status_startup_time():
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "section_browser.main", "status"],
+            capture_output=True,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start)
+    assert min(timings) < STARTUP_BUDGET, (
+        f"'sectionbrowser status' took {min(timings):.2f} s "
+        f"(budget {STARTUP_BUDGET:.2f} s)"
+    )
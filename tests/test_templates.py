@@ -0,0 +1,29 @@
+import numpy as np
+import section_browser.w_sections as wsec
+from section_browser import templates
+
+
+def test_morph_mesh():
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    level = templates.refinement_level(row, 100)
+    assert 2 ** (level - 0.5) <= templates.section_area(row) / 100 <= 2 ** (level + 0.5)
+    template = templates.template_mesh(level)
+    assert templates.template_mesh(level) is template
+    morphed = templates.morphed_mesh(row, 100)
+    assert morphed["triangles"] is template["triangles"]
+    vertices = morphed["vertices"]
+    assert np.allclose(vertices.min(axis=0), [0, 0])
+    assert np.allclose(vertices.max(axis=0), [row["bf"], row["d"]])
+
+    # Morphing back to the canonical section recovers the template's corner nodes
+    restored = templates.morph_mesh(morphed, templates.CANONICAL, source=row)
+    corners = np.unique(np.asarray(template["triangles"])[:, :3])
+    assert np.allclose(restored["vertices"][corners], np.asarray(template["vertices"])[corners])
+
+
+def test_compare_template_meshes():
+    sections_df = wsec.load_aisc_w_sections().iloc[[0, -1]]
+    comparison_df = wsec.compare_template_meshes(sections_df, mesh_size=400)
+    assert comparison_df["Section"].tolist() == sections_df["Section"].tolist()
+    assert (comparison_df["A"].abs() < 1e-6).all()
+    assert (comparison_df["Max difference"] < 0.05).all()
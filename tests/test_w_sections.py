@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+import pytest
 import section_browser.w_sections as wsec
 
 
@@ -37,3 +39,359 @@ def test_sort_by_weight():
     selection = wsec.sort_by_weight(test_df)
     assert selection.iloc[0, 1] == "B"
     assert selection.iloc[1, 1] == "A"
+
+
+def test_calculate_section_stresses_parallel():
+    sections_df = wsec.load_aisc_w_sections().iloc[-2:].copy()
+    sections_df.loc[sections_df.index[0], "tw"] = -5.0  # Invalid geometry
+    analyzed_df = wsec.calculate_section_stresses(
+        sections_df, fy=350, Mx=10e6, mesh_size=500, use_cache=False, workers=2
+    )
+    assert list(analyzed_df.index) == list(sections_df.index)
+    assert analyzed_df["sig_vm Max"].isna().tolist() == [True, False]
+    assert analyzed_df["error"].iloc[0] != ""
+    assert analyzed_df["error"].iloc[1] == ""
+    serial_df = wsec.calculate_section_stresses(
+        sections_df.iloc[1:], fy=350, Mx=10e6, mesh_size=500, use_cache=False
+    )
+    assert "error" not in serial_df.columns
+    assert serial_df["sig_vm Max"].iloc[0] == analyzed_df["sig_vm Max"].iloc[1]
+
+
+def test_iter_section_stresses():
+    sections_df = wsec.load_aisc_w_sections().iloc[-3:]
+    analyzed_df = wsec.calculate_section_stresses(
+        sections_df, fy=350, Mx=10e6, mesh_size=500, use_cache=False
+    )
+    rows = dict(
+        wsec.iter_section_stresses(sections_df, fy=350, Mx=10e6, mesh_size=500, use_cache=False)
+    )
+    assert sorted(rows) == [0, 1, 2]
+    assert list(rows[0].index) == list(analyzed_df.columns) + ["error"]
+    for position, row in rows.items():
+        assert row["error"] == ""
+        assert row["sig_vm Max"] == analyzed_df["sig_vm Max"].iloc[position]
+
+
+def test_load_case_matrix():
+    load_cases = pd.DataFrame(
+        [{"case": "D", "Mx": 5.0}, {"case": "D+L", "N": 1.0, "T": 2.0}]
+    )
+    matrix = wsec.load_case_matrix(load_cases)
+    assert matrix.tolist() == [[0, 0, 0, 5.0, 0, 0], [1.0, 0, 0, 0, 0, 2.0]]
+    assert wsec.normalize_loads({"Mx": 1, "T": 2}) == {"Mx": 1, "Mz": 2}
+
+
+def test_max_vonmises_stresses_superposition():
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    section = wsec.analyze_section(row, mesh_size=500)
+    basis = wsec.unit_stress_basis(section)
+    loads = {"N": 20e3, "Vx": 5e3, "Vy": 30e3, "Mx": 15e6, "My": -3e6, "Mz": 1e6}
+    load_matrix = [[loads[action] for action in wsec.LOAD_COMPONENTS], [0, 0, 0, 1e6, 0, 0]]
+    vm_stresses = wsec.max_vonmises_stresses(basis, load_matrix)
+    assert abs(vm_stresses[0] - wsec.max_vonmises_stress(section, **loads)) < 1e-6
+    assert abs(vm_stresses[1] - wsec.max_vonmises_stress(section, Mx=1e6)) < 1e-6
+
+
+def test_calculate_load_combinations():
+    sections_df = wsec.load_aisc_w_sections().iloc[-1:]
+    load_cases = pd.DataFrame(
+        [{"case": "small", "Mx": 1e6}, {"case": "large", "Mx": 5e6}]
+    )
+    analyzed_df = wsec.calculate_load_combinations(
+        sections_df, 350, load_cases, mesh_size=500, use_cache=False
+    )
+    assert analyzed_df["Governing case"].iloc[0] == "large"
+    assert analyzed_df["DCR stress"].iloc[0] == analyzed_df["sig_vm Max"].iloc[0] / 350
+
+
+def test_screen_sections():
+    sections_df = wsec.load_aisc_w_sections().iloc[-1:]
+    fy = 350
+    load_cases = pd.DataFrame([{"Mx": 1e6}, {"Mx": 5e6, "Vy": 20e3, "T": 1e5}])
+    lower, upper = wsec.screen_vonmises_stress(
+        sections_df, wsec.load_case_matrix(load_cases)
+    )
+    basis = wsec.unit_stress_basis(wsec.analyze_section(sections_df.iloc[0]))
+    fea = wsec.max_vonmises_stresses(basis, wsec.load_case_matrix(load_cases)).max()
+    assert lower[0] <= fea <= upper[0]
+
+    Sx = sections_df["Sx"].iloc[0] * 1e3
+    screen = wsec.screen_sections(
+        sections_df, fy, pd.DataFrame([{"Mx": 0.5 * fy * Sx}, {"Mx": 2 * fy * Sx}])
+    )
+    assert screen["Screen"].iloc[0] == "fail"
+    screen = wsec.screen_sections(sections_df, fy, pd.DataFrame([{"Mx": 0.5 * fy * Sx}]))
+    assert screen["Screen"].iloc[0] == "pass"
+    screen = wsec.screen_sections(sections_df, fy, pd.DataFrame([{"Mx": 1.0 * fy * Sx}]))
+    assert screen["Screen"].iloc[0] == "FEA"
+
+
+# Lightest, heaviest, thinnest web, widest flange and the sections with the
+# smallest and largest ratios of the FEA peak to the thin-walled estimate
+SCREEN_SAMPLE = [
+    "W150X13",
+    "W920X1377",
+    "W200X15",
+    "W360X1299",
+    "W1000X222",
+    "W360X1202",
+    "W690X457",
+    "W1000X350",
+]
+
+
+def assert_screen_bounds_single_actions(sections_df):
+    # The screen must bound the FEA peak under each action for every section
+    unit_loads = np.eye(len(wsec.LOAD_COMPONENTS))
+    bounds = [wsec.screen_vonmises_stress(sections_df, unit_load) for unit_load in unit_loads]
+    lower = np.column_stack([bound[0] for bound in bounds])
+    upper = np.column_stack([bound[1] for bound in bounds])
+    for idx, (_, row) in enumerate(sections_df.iterrows()):
+        basis = wsec.section_stress_basis(row)
+        fea = wsec.max_vonmises_stresses(basis, unit_loads)
+        assert np.all(lower[idx] <= fea), row["Section"]
+        assert np.all(fea <= upper[idx]), row["Section"]
+
+
+def test_screen_bounds_single_actions():
+    aisc_df = wsec.load_aisc_w_sections()
+    sample_df = aisc_df.loc[aisc_df["Section"].isin(SCREEN_SAMPLE)]
+    assert len(sample_df) == len(SCREEN_SAMPLE)
+    assert_screen_bounds_single_actions(sample_df)
+
+
+@pytest.mark.benchmark
+def test_screen_bounds_single_actions_catalog():
+    assert_screen_bounds_single_actions(wsec.load_aisc_w_sections())
+
+
+def test_lightest_adequate_section(monkeypatch):
+    sections_df = wsec.load_aisc_w_sections().iloc[-9:]
+    load_cases = pd.DataFrame([{"Mx": 30e6}])
+    lightest, n_analyzed = wsec.lightest_adequate_section(
+        sections_df, 350, load_cases, mesh_size=500, use_cache=False
+    )
+    analyzed_df = wsec.calculate_load_combinations(
+        wsec.sort_by_weight(sections_df), 350, load_cases, mesh_size=500, use_cache=False
+    )
+    adequate_df = analyzed_df.loc[analyzed_df["DCR stress"] <= 1.0]
+    assert lightest["Section"] == adequate_df["Section"].iloc[0]
+    assert lightest["DCR stress"] <= 1.0
+    assert n_analyzed < len(sections_df)
+
+    # W150X13.5 tabulated as no stronger than W150X13, which fails: the
+    # heuristic skips it, the default search analyzes it and finds it adequate
+    misleading_df = sections_df.copy()
+    misleading_df.loc[misleading_df["Section"] == "W150X13.5", "Sx"] = 83.6
+    analyzed_df = wsec.calculate_load_combinations(
+        wsec.sort_by_weight(misleading_df), 350, load_cases, mesh_size=500, use_cache=False
+    )
+    assert analyzed_df.loc[analyzed_df["DCR stress"] <= 1.0, "Section"].iloc[0] == "W150X13.5"
+    lightest, _ = wsec.lightest_adequate_section(
+        misleading_df, 350, load_cases, mesh_size=500, use_cache=False
+    )
+    assert lightest["Section"] == "W150X13.5"
+    lightest, _ = wsec.lightest_adequate_section(
+        misleading_df, 350, load_cases, mesh_size=500, use_cache=False, heuristic=True
+    )
+    assert lightest["Section"] != "W150X13.5"
+
+    # A screened "pass" is confirmed with FEA
+    monkeypatch.setattr(wsec, "SCREEN_FACTORS", {action: (0, 0) for action in wsec.LOAD_COMPONENTS})
+    lightest, _ = wsec.lightest_adequate_section(
+        sections_df, 350, load_cases, mesh_size=500, use_cache=False
+    )
+    assert lightest["Section"] == adequate_df["Section"].iloc[0]
+    monkeypatch.undo()
+
+    # A section that fails to analyze does not prune the heavier sections
+    broken_df = sections_df.copy()
+    # Invalid geometry, tabulated as stronger than every other section
+    broken_df.loc[broken_df["Section"] == "W150X13", ["tw", "Sx"]] = [-5.0, 1e6]
+    lightest, _ = wsec.lightest_adequate_section(
+        broken_df, 350, load_cases, mesh_size=500, use_cache=False, heuristic=True
+    )
+    assert lightest["Section"] == adequate_df["Section"].iloc[0]
+
+    lightest, _ = wsec.lightest_adequate_section(
+        sections_df, 350, pd.DataFrame([{"Mx": 1e9}]), use_cache=False
+    )
+    assert lightest is None
+
+
+def test_lightest_adequate_section_brute_force():
+    sections_df = wsec.load_aisc_w_sections().iloc[-12:]
+    load_cases = pd.DataFrame(
+        [
+            {"case": "A", "N": 100e3, "Mx": 24e6, "My": 4e6, "Vy": 80e3},
+            {"case": "B", "Mx": 12e6, "Vx": 40e3, "Vy": 40e3, "Mz": 4e5},
+        ]
+    )
+    analyzed_df = wsec.calculate_load_combinations(
+        wsec.sort_by_weight(sections_df), 350, load_cases, mesh_size=500, use_cache=False
+    )
+    lightest_adequate = analyzed_df.loc[analyzed_df["DCR stress"] <= 1.0, "Section"].iloc[0]
+    for heuristic in [False, True]:
+        lightest, n_analyzed = wsec.lightest_adequate_section(
+            sections_df, 350, load_cases, mesh_size=500, use_cache=False, heuristic=heuristic
+        )
+        assert lightest["Section"] == lightest_adequate
+        assert lightest["DCR stress"] <= 1.0
+
+
+def test_filter_mask():
+    test_df = pd.DataFrame(
+        data=[["A", 200, 300], ["B", 250, 250], ["C", 400, 600], ["D", 500, 700]],
+        columns=["Section", "Ix", "Sy"],
+    )
+    mask = wsec.filter_mask(test_df, {"Ix": [("ge", 250)], "Sy": [("<", 700)]})
+    assert mask.tolist() == [False, True, True, False]
+    mask = wsec.filter_mask(test_df, {"Section": [("==", "A"), ("==", "D")]})
+    assert mask.tolist() == [True, False, False, True]
+
+
+def test_section_critical_basis():
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    basis = wsec.unit_stress_basis(wsec.analyze_section(row, mesh_size=50))
+    nodes = wsec.critical_nodes(basis)
+    assert len(nodes) < basis.shape[-1] / 4
+    critical_basis = wsec.section_critical_basis(row, mesh_size=50)
+    assert critical_basis.tolist() == basis[:, :, nodes].tolist()
+
+    single_actions = np.diag([20e3, 5e3, 30e3, 15e6, 3e6, 1e6])
+    assert wsec.max_vonmises_stresses(critical_basis, single_actions).tolist() == (
+        wsec.max_vonmises_stresses(basis, single_actions).tolist()
+    )
+    rng = np.random.default_rng(1)
+    load_matrix = rng.normal(size=(500, 6)) * [20e3, 5e3, 30e3, 15e6, 3e6, 1e6]
+    critical = wsec.max_vonmises_stresses(critical_basis, load_matrix)
+    full = wsec.max_vonmises_stresses(basis, load_matrix)
+    assert np.all(critical <= full)
+    assert np.all(critical >= 0.99 * full)
+
+
+def test_converged_mesh_size(tmp_path, monkeypatch):
+    row = wsec.load_aisc_w_sections().iloc[-1]
+    assert wsec.initial_mesh_size(row) == min(row["tw"], row["tf"]) ** 2
+    monkeypatch.setattr(wsec, "initial_mesh_size", lambda steel_section: 400.0)
+    section_cache = wsec.section_cache.SectionCache(tmp_path)
+    load_matrix = [[0, 0, 0, 5e6, 0, 0], [0, 0, 0, 1e6, 0, 0]]
+    mesh_size, converged = wsec.converged_mesh_size(row, load_matrix, 0.05, cache=section_cache)
+    assert converged
+    assert mesh_size < 400.0
+    coarser, finer = [
+        wsec.max_vonmises_stresses(wsec.section_stress_basis(row, size, section_cache), [0, 0, 0, 1, 0, 0])
+        for size in (mesh_size * wsec.MESH_REFINEMENT_RATIO, mesh_size)
+    ]
+    assert abs(finer - coarser) <= 0.05 * finer
+    assert wsec.converged_mesh_size(row, load_matrix, 0.05, cache=section_cache) == (mesh_size, True)
+
+    analyzed_df = wsec.calculate_section_stresses(
+        wsec.load_aisc_w_sections().iloc[-1:], fy=350, Mx=5e6, use_cache=False, tol=0.05
+    )
+    assert analyzed_df["mesh_size"].tolist() == [mesh_size]
+
+
+def test_nearest_sections():
+    aisc_df = wsec.load_aisc_w_sections()
+    nearest_df = wsec.nearest_sections(aisc_df, k=5, d=530, Ix=400)
+    assert len(nearest_df) == 5
+    assert nearest_df.iloc[0]["Section"] == "W530X72"
+    assert nearest_df["Distance"].is_monotonic_increasing
+    expected = np.sqrt(np.log(aisc_df["d"] / 530) ** 2 + np.log(aisc_df["Ix"] / 400) ** 2)
+    assert np.allclose(nearest_df["Distance"], np.sort(expected)[:5])
+    # The same tree is re-used by the next query on the same columns
+    n_trees = len(wsec._nearest_trees)
+    wsec.nearest_sections(aisc_df, k=2, d=300, Ix=100)
+    assert len(wsec._nearest_trees) == n_trees
+
+    # "@" terms rank the sections passing the other conditions
+    filtered_df = wsec.filter_sections(
+        aisc_df, {"d": [("@", 530)], "Ix": [("@", 400)], "bf": [(">", 200)]}, k=3
+    )
+    assert len(filtered_df) == 3
+    assert (filtered_df["bf"] > 200).all()
+    assert filtered_df["Distance"].is_monotonic_increasing
+
+    # "@" alternatives select the union of the nearest sections to each value
+    filtered_df = wsec.filter_sections(aisc_df, {"d": [("@", 530), ("@", 610)]}, k=3)
+    expected = pd.concat(
+        [wsec.nearest_sections(aisc_df, k=3, d=530), wsec.nearest_sections(aisc_df, k=3, d=610)]
+    )
+    assert set(filtered_df["Section"]) == set(expected["Section"])
+    assert len(filtered_df) == len(set(expected["Section"]))
+    assert filtered_df["Distance"].is_monotonic_increasing
+    # No section is selected for being within APPROX_TOLERANCE of 530 or 610
+    assert len(filtered_df) < wsec.filter_mask(aisc_df, {"d": [("@", 530), ("@", 610)]}).sum()
+    with pytest.raises(ValueError):
+        wsec.filter_sections(aisc_df, {"d": [("@", 530), (">", 900)]})
+
+
+def test_pareto_front():
+    rng = np.random.default_rng(0)
+    test_df = pd.DataFrame(rng.integers(0, 20, size=(200, 3)), columns=["W", "Zx", "Iy"])
+    test_df.loc[5, "Zx"] = np.nan
+    for objectives in ({"W": "min", "Zx": "max"}, {"W": "min", "Zx": "max", "Iy": "max"}):
+        costs = test_df[list(objectives)].to_numpy(dtype=float) * [
+            1 if sense == "min" else -1 for sense in objectives.values()
+        ]
+        expected = [
+            idx
+            for idx, cost in zip(test_df.index, costs)
+            if not np.isnan(cost).any()
+            and not np.any(np.all(costs <= cost, axis=1) & np.any(costs < cost, axis=1))
+        ]
+        front_df = wsec.pareto_front(test_df, objectives)
+        assert sorted(front_df.index) == expected
+        assert front_df["W"].is_monotonic_increasing
+
+    aisc_df = wsec.load_aisc_w_sections()
+    front_df = wsec.pareto_front(aisc_df, {"W": "min", "Zx": "max"})
+    assert front_df.iloc[0]["W"] == aisc_df["W"].min()
+    assert front_df.iloc[-1]["Zx"] == aisc_df["Zx"].max()
+
+
+def test_surrogate(tmp_path):
+    sections_df = wsec.load_aisc_w_sections().iloc[[-1, -2]]
+    section_cache = wsec.section_cache.SectionCache(tmp_path / "cache")
+    model = wsec.train_surrogate(sections_df, mesh_size=400, use_cache=False)
+    wsec.save_surrogate(model, tmp_path / "surrogate.npz")
+    wsec._surrogates.clear()
+    loaded_model = wsec.load_surrogate(tmp_path / "surrogate.npz")
+    assert list(loaded_model["Section"]) == list(sections_df["Section"])
+
+    load_matrix = np.array([[1e3, 2e3, 5e3, 1e6, 2e5, 1e4], [0, 0, 0, 1e6, 0, 0]])
+    estimate, lower, upper = wsec.surrogate_vonmises_stresses(sections_df, load_matrix, loaded_model)
+    fea = np.array(
+        [
+            wsec.max_vonmises_stresses(wsec.section_stress_basis(row, 400, section_cache), load_matrix)
+            for _, row in sections_df.iterrows()
+        ]
+    )
+    assert np.allclose(estimate, fea, rtol=0.02)
+    assert np.all(lower <= fea * (1 + 1e-6)) and np.all(fea <= upper * (1 + 1e-6))
+
+    # Many combinations are evaluated in chunks with the same result
+    many_loads = np.random.default_rng(0).normal(size=(40, 6)) * [1e3, 2e3, 5e3, 1e6, 2e5, 1e4]
+    chunked, _, _ = wsec.surrogate_vonmises_stresses(sections_df, many_loads, loaded_model)
+    for idx, loads in enumerate(many_loads):
+        single, _, _ = wsec.surrogate_vonmises_stresses(sections_df, loads, loaded_model)
+        assert np.allclose(chunked[:, idx], single[:, 0])
+
+    # Models trained by the user are saved to, and loaded from, the cache directory
+    wsec.save_surrogate(model)
+    assert wsec.surrogate_path().exists()
+    wsec._surrogates.clear()
+    assert list(wsec.load_surrogate()["Section"]) == list(sections_df["Section"])
+    wsec.surrogate_path().unlink()
+    assert len(wsec.load_surrogate()["Section"]) > len(sections_df)
+
+    # Sections that are not in the model (or have changed) are not estimated
+    other_df = wsec.load_aisc_w_sections().iloc[[0, -1]]
+    other_df.loc[other_df.index[1], "d"] += 1
+    analyzed_df = wsec.calculate_approx_stresses(
+        other_df, 350, pd.DataFrame(load_matrix, columns=wsec.LOAD_COMPONENTS), loaded_model
+    )
+    assert analyzed_df["sig_vm Max"].isna().all()
+    assert (analyzed_df["error"] == "Not in the surrogate model").all()